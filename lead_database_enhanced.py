@@ -3,46 +3,161 @@ Enhanced Lead Database Module
 Handles lead storage, deduplication, and data management
 """
 
+import csv
 import sqlite3
-import pandas as pd
-import hashlib
-from typing import List, Dict, Optional, Tuple
+from itertools import chain, islice
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
 import logging
-from dataclasses import dataclass
+
+try:
+    import apsw
+except ImportError:
+    apsw = None
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class LeadRecord:
-    """Lead record structure for database operations"""
-    id: Optional[int] = None
-    name: str = ""
-    address: str = ""
-    city: str = ""
-    country: str = ""
-    niche: str = ""
-    phone: str = ""
-    email: str = ""
-    website: str = ""
-    source: str = ""
-    scraped_at: str = ""
-    created_at: Optional[str] = None
-    updated_at: Optional[str] = None
+# Lead fields accepted from scrapers, in leads table column order
+LEAD_FIELDS = [
+    'name', 'address', 'city', 'country', 'niche',
+    'phone', 'email', 'website', 'source', 'scraped_at'
+]
+
+# Fields that take part in deduplication. Each gets a <field>_norm column
+# holding fold_case(<field>), filled in on insert. SQLite's lower() folds
+# ASCII letters only, and a Python function in a generated column would
+# leave the file unreadable to other SQLite clients, so these are ordinary
+# stored columns. Rows written by other clients leave them NULL, which the
+# unique indexes treat as distinct.
+NORMALIZED_FIELDS = ['name', 'address', 'email', 'phone']
+
+# Positions of NORMALIZED_FIELDS within a LEAD_FIELDS-ordered row
+NORMALIZED_FIELD_POSITIONS = [LEAD_FIELDS.index(field) for field in NORMALIZED_FIELDS]
+
+# Columns returned by get_leads/iter_leads by default (the *_norm columns
+# are internal to deduplication)
+LEAD_COLUMNS = ['id', *LEAD_FIELDS, 'created_at', 'updated_at']
+
+# Unique indexes backing deduplication. Empty email/phone values mean "no
+# value", so partial indexes keep them out instead of piling up one huge
+# cluster of identical '' keys.
+UNIQUE_INDEXES = {
+    'idx_unique_name_address': "CREATE UNIQUE INDEX idx_unique_name_address ON leads(name_norm, address_norm)",
+    'idx_unique_email_phone': "CREATE UNIQUE INDEX idx_unique_email_phone ON leads(email_norm, phone_norm) WHERE email_norm != '' AND phone_norm != ''",
+    'idx_unique_email': "CREATE UNIQUE INDEX idx_unique_email ON leads(email_norm) WHERE email_norm != ''",
+}
+
+# The keys of UNIQUE_INDEXES as (columns, row filter), for finding rows that
+# already collide on one. NULLs never collide in a unique index, so rows
+# without normalized values are left out.
+UNIQUE_KEYS = [
+    ('name_norm, address_norm', "name_norm IS NOT NULL AND address_norm IS NOT NULL"),
+    ('email_norm, phone_norm', "email_norm != '' AND phone_norm != ''"),
+    ('email_norm', "email_norm != ''"),
+]
+
+# Non-unique lookup indexes
+SECONDARY_INDEXES = {
+    'idx_source': "CREATE INDEX idx_source ON leads(source)",
+    'idx_city_country': "CREATE INDEX idx_city_country ON leads(city, country)",
+    'idx_niche': "CREATE INDEX idx_niche ON leads(niche)",
+}
+
+# Indexes over the md5 *_hash columns used before normalized columns
+LEGACY_HASH_INDEXES = ['idx_name_hash', 'idx_address_hash', 'idx_email_hash', 'idx_phone_hash']
+
+# Lead insert; duplicates are skipped by the unique indexes
+INSERT_LEAD_SQL = """
+    INSERT OR IGNORE INTO leads (
+        name, address, city, country, niche, phone, email, website, 
+        source, scraped_at, name_norm, address_norm, email_norm, phone_norm,
+        created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Lead columns pre-aggregated in the lead_stats table
+STATS_DIMENSIONS = ['source', 'city', 'niche']
+
+# Columns get_leads filters by substring, indexed in the leads_fts table
+TEXT_FILTER_FIELDS = ['city', 'country', 'niche']
+
+# Rows committed per transaction by insert_leads and insert_lead_rows
+INSERT_CHUNK_SIZE = 10000
+
+# Page cache per connection, in KiB when negative (SQLite default is ~2 MB)
+CACHE_SIZE_KIB = 20000
+
+# WAL pages written before an automatic checkpoint (SQLite default is 1000)
+WAL_AUTOCHECKPOINT_PAGES = 10000
+
+# Bytes of the database file memory-mapped for reads
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+
+# Applied to every connection. synchronous=NORMAL is durable in WAL mode
+# except for the last commits before a power loss, and skips an fsync per
+# commit; checkpointing less often keeps long writes from stalling.
+CONNECTION_PRAGMAS = [
+    f"PRAGMA cache_size = -{CACHE_SIZE_KIB}",
+    f"PRAGMA wal_autocheckpoint = {WAL_AUTOCHECKPOINT_PAGES}",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}",
+]
+
+def fold_case(text: Optional[str]) -> str:
+    """
+    Strip and case-fold text for deduplication keys
+    
+    Fills the <field>_norm columns. Unlike SQLite's lower() this also folds
+    non-ASCII letters, so "ÉCOLE" and "école" match; ASCII text, the common
+    case, takes the cheaper str.lower().
+    """
+    if not text:
+        return ''
+    text = text.strip()
+    return text.lower() if text.isascii() else text.casefold()
 
 class LeadDatabase:
     """Enhanced database manager for lead storage and deduplication"""
     
     def __init__(self, db_path: str = "leadai_pro.db"):
         self.db_path = db_path
+        self.fts_enabled = False
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the module's standard PRAGMAs applied"""
+        conn = sqlite3.connect(self.db_path)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _connect_bulk(self):
+        """
+        Open a connection for bulk_import, preferring APSW when installed
+        
+        APSW binds parameters with less per-row overhead than the stdlib
+        driver, which shows on large executemany loads. Only the subset of
+        the API both drivers share (execute, executemany, fetchall) is used.
+        """
+        if apsw is None:
+            return self._connect()
+        
+        conn = apsw.Connection(self.db_path)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
     def _init_database(self):
         """Initialize database with enhanced schema"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
+                # WAL lets readers run alongside writes; the mode persists
+                # in the database file
+                cursor.execute("PRAGMA journal_mode = WAL")
+                
                 # Create leads table with enhanced schema
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS leads (
@@ -59,20 +174,13 @@ class LeadDatabase:
                         scraped_at TEXT DEFAULT '',
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        name_hash TEXT,
-                        address_hash TEXT,
-                        email_hash TEXT,
-                        phone_hash TEXT
+                        name_norm TEXT,
+                        address_norm TEXT,
+                        email_norm TEXT,
+                        phone_norm TEXT
                     )
                 """)
                 
-                # Add unique constraints after table creation
-                try:
-                    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_name_address ON leads(name_hash, address_hash)")
-                    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_email_phone ON leads(email_hash, phone_hash)")
-                except sqlite3.OperationalError as e:
-                    logger.warning(f"Could not create unique constraints: {e}")
-                
                 # Create deduplication log table
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS deduplication_log (
@@ -86,17 +194,19 @@ class LeadDatabase:
                     )
                 """)
                 
+                self._init_stats_table(cursor)
+                self._add_normalized_columns(cursor)
+                self._init_unique_indexes(cursor)
+                self._drop_hash_columns(cursor)
+                
+                self.fts_enabled = self._init_fts_table(cursor)
+                
                 conn.commit()
                 
                 # Create indexes for better performance (after table creation)
                 try:
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_name_hash ON leads(name_hash)")
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_address_hash ON leads(address_hash)")
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_email_hash ON leads(email_hash)")
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_phone_hash ON leads(phone_hash)")
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_source ON leads(source)")
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_city_country ON leads(city, country)")
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_niche ON leads(niche)")
+                    for index_name, definition in SECONDARY_INDEXES.items():
+                        self._ensure_index(cursor, index_name, definition)
                     conn.commit()
                 except sqlite3.OperationalError as e:
                     # If indexes fail, continue without them
@@ -108,27 +218,226 @@ class LeadDatabase:
             logger.error(f"Error initializing database: {e}")
             raise
     
-    def _generate_hash(self, text: str) -> str:
-        """Generate hash for text (used for deduplication)"""
-        if not text:
-            return ""
-        return hashlib.md5(text.lower().strip().encode()).hexdigest()
+    def _add_normalized_columns(self, cursor):
+        """Add and fill the <field>_norm columns of databases created before them"""
+        # table_xinfo (unlike table_info) also lists generated columns; its
+        # hidden flag is 2 or 3 for them
+        cursor.execute("PRAGMA table_xinfo(leads)")
+        existing_columns = {row[1]: row[6] for row in cursor.fetchall()}
+        
+        # Earlier versions generated these columns, with lower() or with a
+        # Python fold_case() function. SQLite cannot turn a generated column
+        # into a stored one, so they are dropped (DROP COLUMN, SQLite 3.35+)
+        # together with the unique indexes over them, which _init_database
+        # rebuilds. The old fold_case() expression has to resolve while the
+        # table is rewritten.
+        generated_fields = [
+            field for field in NORMALIZED_FIELDS
+            if existing_columns.get(f'{field}_norm') in (2, 3)
+        ]
+        if generated_fields:
+            cursor.connection.create_function('fold_case', 1, fold_case, deterministic=True)
+            for index_name in UNIQUE_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+            for field in generated_fields:
+                cursor.execute(f"ALTER TABLE leads DROP COLUMN {field}_norm")
+                del existing_columns[f'{field}_norm']
+        
+        missing_fields = [field for field in NORMALIZED_FIELDS if f'{field}_norm' not in existing_columns]
+        if not missing_fields:
+            return
+        
+        for field in missing_fields:
+            cursor.execute(f"ALTER TABLE leads ADD COLUMN {field}_norm TEXT")
+        
+        cursor.execute(f"SELECT id, {', '.join(NORMALIZED_FIELDS)} FROM leads")
+        rows = cursor.fetchall()
+        assignments = ', '.join(f"{field}_norm = ?" for field in NORMALIZED_FIELDS)
+        cursor.executemany(
+            f"UPDATE leads SET {assignments} WHERE id = ?",
+            [(*(fold_case(value) for value in values), lead_id) for lead_id, *values in rows]
+        )
+    
+    def _init_unique_indexes(self, cursor):
+        """
+        Create the unique indexes deduplication relies on
+        
+        Rows that already collide on a key (legacy data, or keys that only
+        match once the migration folds non-ASCII case) would keep an index
+        from being built and leave inserts undeduplicated, so they are
+        removed first, keeping the oldest. Failing to build an index is an
+        error.
+        """
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index'")
+        existing_indexes = dict(cursor.fetchall())
+        if all(existing_indexes.get(name) == definition for name, definition in UNIQUE_INDEXES.items()):
+            return
+        
+        duplicates_removed = self._delete_duplicates(cursor)
+        if duplicates_removed:
+            logger.warning(f"Removed {duplicates_removed} duplicate leads before building unique indexes")
+            self._log_dedup(cursor, 'migration_cleanup', 0, duplicates_removed, 0)
+        
+        for index_name, definition in UNIQUE_INDEXES.items():
+            self._ensure_index(cursor, index_name, definition)
+    
+    def _delete_duplicates(self, cursor) -> int:
+        """Delete all but the oldest lead of each UNIQUE_KEYS group, returning how many went"""
+        # One pass per key; window functions need SQLite 3.25+
+        duplicates_removed = 0
+        for columns, condition in UNIQUE_KEYS:
+            cursor.execute(f"""
+                DELETE FROM leads 
+                WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY {columns} ORDER BY id
+                        ) AS rn
+                        FROM leads
+                        WHERE {condition}
+                    )
+                    WHERE rn > 1
+                )
+            """)
+            duplicates_removed += cursor.rowcount
+        return duplicates_removed
+    
+    def _drop_hash_columns(self, cursor):
+        """Remove the md5 *_hash columns and indexes of older databases"""
+        cursor.execute("PRAGMA table_info(leads)")
+        hash_columns = [
+            row[1] for row in cursor.fetchall()
+            if row[1] in {f'{field}_hash' for field in NORMALIZED_FIELDS}
+        ]
+        if not hash_columns:
+            return
+        
+        for index_name in LEGACY_HASH_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+        
+        try:
+            # DROP COLUMN needs SQLite 3.35+; the columns are harmless otherwise
+            for column in hash_columns:
+                cursor.execute(f"ALTER TABLE leads DROP COLUMN {column}")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Could not drop legacy hash columns: {e}")
+    
+    def _init_stats_table(self, cursor):
+        """Create the lead_stats summary table and the triggers maintaining it"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lead_stats'")
+        stats_exists = cursor.fetchone() is not None
+        
+        # Lead counts per source/city/niche, so get_lead_stats doesn't have
+        # to aggregate the whole leads table on every call
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS lead_stats (
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, key)
+            )
+        """)
+        
+        # Backfill from existing leads the first time the table is created
+        if not stats_exists:
+            for dimension in STATS_DIMENSIONS:
+                cursor.execute(f"""
+                    INSERT INTO lead_stats (dimension, key, count)
+                    SELECT '{dimension}', {dimension}, COUNT(*) FROM leads GROUP BY {dimension}
+                """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_leads_stats_insert AFTER INSERT ON leads
+            BEGIN
+                INSERT INTO lead_stats (dimension, key, count) VALUES ('source', NEW.source, 1)
+                    ON CONFLICT (dimension, key) DO UPDATE SET count = count + 1;
+                INSERT INTO lead_stats (dimension, key, count) VALUES ('city', NEW.city, 1)
+                    ON CONFLICT (dimension, key) DO UPDATE SET count = count + 1;
+                INSERT INTO lead_stats (dimension, key, count) VALUES ('niche', NEW.niche, 1)
+                    ON CONFLICT (dimension, key) DO UPDATE SET count = count + 1;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_leads_stats_delete AFTER DELETE ON leads
+            BEGIN
+                UPDATE lead_stats SET count = count - 1 WHERE dimension = 'source' AND key = OLD.source;
+                UPDATE lead_stats SET count = count - 1 WHERE dimension = 'city' AND key = OLD.city;
+                UPDATE lead_stats SET count = count - 1 WHERE dimension = 'niche' AND key = OLD.niche;
+            END
+        """)
+    
+    def _init_fts_table(self, cursor) -> bool:
+        """
+        Create the leads_fts search index over the text filter columns
+        
+        The trigram tokenizer lets FTS5 answer the same '%value%' LIKE
+        patterns get_leads already uses (SQLite 3.34+). Returns False if
+        FTS5 is unavailable, in which case get_leads scans leads directly.
+        """
+        try:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads_fts'")
+            fts_exists = cursor.fetchone() is not None
+            
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+                    city, country, niche,
+                    content='leads', content_rowid='id', tokenize='trigram'
+                )
+            """)
+            
+            # Index existing leads the first time the table is created
+            if not fts_exists:
+                cursor.execute("INSERT INTO leads_fts(leads_fts) VALUES ('rebuild')")
+            
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_leads_fts_insert AFTER INSERT ON leads
+                BEGIN
+                    INSERT INTO leads_fts (rowid, city, country, niche)
+                    VALUES (NEW.id, NEW.city, NEW.country, NEW.niche);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_leads_fts_delete AFTER DELETE ON leads
+                BEGIN
+                    INSERT INTO leads_fts (leads_fts, rowid, city, country, niche)
+                    VALUES ('delete', OLD.id, OLD.city, OLD.country, OLD.niche);
+                END
+            """)
+            return True
+            
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Full-text search unavailable, filtering with LIKE scans: {e}")
+            return False
     
-    def _prepare_lead_data(self, lead_data: Dict) -> LeadRecord:
-        """Prepare lead data for database insertion"""
-        return LeadRecord(
-            name=lead_data.get('name', ''),
-            address=lead_data.get('address', ''),
-            city=lead_data.get('city', ''),
-            country=lead_data.get('country', ''),
-            niche=lead_data.get('niche', ''),
-            phone=lead_data.get('phone', ''),
-            email=lead_data.get('email', ''),
-            website=lead_data.get('website', ''),
-            source=lead_data.get('source', ''),
-            scraped_at=lead_data.get('scraped_at', ''),
-            created_at=datetime.now().isoformat()
+    def _ensure_index(self, cursor, index_name: str, definition: str):
+        """Create an index, replacing an existing one whose definition differs"""
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?",
+            (index_name,)
         )
+        row = cursor.fetchone()
+        
+        if row and row[0] == definition:
+            return
+        if row:
+            # Older databases carry earlier definitions (full rather than
+            # partial, or over the md5 hash columns)
+            cursor.execute(f"DROP INDEX {index_name}")
+        cursor.execute(definition)
+    
+    def _prepare_lead_rows(self, leads_data: List[Dict]) -> Iterator[Tuple]:
+        """
+        Build LEAD_FIELDS-ordered tuples for a batch of lead dicts
+        
+        Values are gathered column by column and zipped into rows, which
+        avoids building an object per lead.
+        """
+        columns = [
+            [str(lead.get(field) or '') for lead in leads_data]
+            for field in LEAD_FIELDS
+        ]
+        
+        return zip(*columns)
     
     def insert_leads(self, leads_data: List[Dict]) -> Tuple[int, int, int]:
         """
@@ -143,68 +452,51 @@ class LeadDatabase:
         if not leads_data:
             return 0, 0, 0
         
-        total_processed = len(leads_data)
-        duplicates_found = 0
+        return self.insert_lead_rows(self._prepare_lead_rows(leads_data))
+    
+    def insert_lead_rows(self, rows: Iterable[Tuple]) -> Tuple[int, int, int]:
+        """
+        Insert leads given as tuples in LEAD_FIELDS order, with deduplication
+        
+        Callers that already hold lead objects can stream rows straight in
+        without building a dict per lead. Values should be strings, with ''
+        for missing fields.
+        
+        Args:
+            rows: Iterable of lead tuples
+            
+        Returns:
+            Tuple of (total_processed, duplicates_found, successfully_inserted)
+        """
+        rows = iter(rows)
+        total_processed = 0
         successfully_inserted = 0
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
+                created_at = datetime.now().isoformat()
+                
+                # Commit in fixed-size chunks so one huge batch can't grow the
+                # WAL and page cache without bound
+                chunk = list(islice(rows, INSERT_CHUNK_SIZE))
+                while chunk:
+                    total_processed += len(chunk)
+                    successfully_inserted += self._write_leads(cursor, chunk, created_at)
+                    conn.commit()
+                    
+                    chunk = list(islice(rows, INSERT_CHUNK_SIZE))
+                    if chunk:
+                        cursor.execute("PRAGMA wal_checkpoint(PASSIVE)")
                 
-                for lead_data in leads_data:
-                    try:
-                        # Prepare lead data
-                        lead = self._prepare_lead_data(lead_data)
-                        
-                        # Generate hashes for deduplication
-                        name_hash = self._generate_hash(lead.name)
-                        address_hash = self._generate_hash(lead.address)
-                        email_hash = self._generate_hash(lead.email)
-                        phone_hash = self._generate_hash(lead.phone)
-                        
-                        # Check for duplicates
-                        is_duplicate = self._check_duplicate(
-                            cursor, name_hash, address_hash, email_hash, phone_hash
-                        )
-                        
-                        if is_duplicate:
-                            duplicates_found += 1
-                            continue
-                        
-                        # Insert new lead
-                        cursor.execute("""
-                            INSERT INTO leads (
-                                name, address, city, country, niche, phone, email, website, 
-                                source, scraped_at, created_at, updated_at,
-                                name_hash, address_hash, email_hash, phone_hash
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            lead.name, lead.address, lead.city, lead.country, lead.niche,
-                            lead.phone, lead.email, lead.website, lead.source, lead.scraped_at,
-                            lead.created_at, lead.created_at,
-                            name_hash, address_hash, email_hash, phone_hash
-                        ))
-                        
-                        successfully_inserted += 1
-                        
-                    except sqlite3.IntegrityError:
-                        # Handle unique constraint violations
-                        duplicates_found += 1
-                        continue
-                    except Exception as e:
-                        logger.warning(f"Error inserting lead {lead_data.get('name', 'Unknown')}: {e}")
-                        continue
+                if not total_processed:
+                    return 0, 0, 0
                 
-                # Log deduplication operation
-                cursor.execute("""
-                    INSERT INTO deduplication_log (
-                        operation_type, total_leads, duplicates_found, 
-                        duplicates_removed, final_count
-                    ) VALUES (?, ?, ?, ?, ?)
-                """, (
-                    'insert_with_dedup', total_processed, duplicates_found,
+                duplicates_found = total_processed - successfully_inserted
+                self._log_dedup(
+                    cursor, 'insert_with_dedup', total_processed,
                     duplicates_found, successfully_inserted
-                ))
+                )
                 
                 conn.commit()
                 logger.info(f"Inserted {successfully_inserted} leads, found {duplicates_found} duplicates")
@@ -215,44 +507,107 @@ class LeadDatabase:
         
         return total_processed, duplicates_found, successfully_inserted
     
-    def _check_duplicate(self, cursor, name_hash: str, address_hash: str, 
-                        email_hash: str, phone_hash: str) -> bool:
-        """Check if lead is duplicate based on multiple criteria"""
-        try:
-            # Check by name + address
-            cursor.execute("""
-                SELECT id FROM leads 
-                WHERE name_hash = ? AND address_hash = ?
-            """, (name_hash, address_hash))
-            
-            if cursor.fetchone():
-                return True
+    def bulk_import(self, leads_data: List[Dict]) -> Tuple[int, int, int]:
+        """
+        Insert a very large batch of leads with deduplication
+        
+        Updating every secondary index row by row dominates the cost of big
+        initial loads, so those indexes are dropped for the import and rebuilt
+        in one pass afterwards. Unique indexes stay in place to keep
+        deduplication intact. Everything runs in a single transaction.
+        
+        Args:
+            leads_data: List of lead dictionaries
             
-            # Check by email + phone (if both exist)
-            if email_hash and phone_hash:
-                cursor.execute("""
-                    SELECT id FROM leads 
-                    WHERE email_hash = ? AND phone_hash = ?
-                """, (email_hash, phone_hash))
+        Returns:
+            Tuple of (total_processed, duplicates_found, successfully_inserted)
+        """
+        if not leads_data:
+            return 0, 0, 0
+        
+        total_processed = len(leads_data)
+        
+        try:
+            conn = self._connect_bulk()
+            try:
+                conn.execute("BEGIN")
+                try:
+                    for index_name in SECONDARY_INDEXES:
+                        conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+                    
+                    # APSW has no rowcount, so count new rows directly
+                    leads_before = conn.execute("SELECT COUNT(*) FROM leads").fetchall()[0][0]
+                    created_at = datetime.now().isoformat()
+                    conn.executemany(INSERT_LEAD_SQL, self._insert_params(
+                        self._prepare_lead_rows(leads_data), created_at
+                    ))
+                    leads_after = conn.execute("SELECT COUNT(*) FROM leads").fetchall()[0][0]
+                    
+                    successfully_inserted = leads_after - leads_before
+                    duplicates_found = total_processed - successfully_inserted
+                    self._log_dedup(
+                        conn, 'bulk_import', total_processed,
+                        duplicates_found, successfully_inserted
+                    )
+                    
+                    for definition in SECONDARY_INDEXES.values():
+                        conn.execute(definition)
+                    
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
                 
-                if cursor.fetchone():
-                    return True
-            
-            # Check by email only (if email exists)
-            if email_hash:
-                cursor.execute("""
-                    SELECT id FROM leads 
-                    WHERE email_hash = ?
-                """, (email_hash,))
+                # Fold the import's WAL back into the database and reset it
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                logger.info(f"Bulk imported {successfully_inserted} leads, found {duplicates_found} duplicates")
+            finally:
+                conn.close()
                 
-                if cursor.fetchone():
-                    return True
-            
-            return False
-            
         except Exception as e:
-            logger.warning(f"Error checking duplicate: {e}")
-            return False
+            logger.error(f"Error bulk importing leads: {e}")
+            raise
+        
+        return total_processed, duplicates_found, successfully_inserted
+    
+    def _write_leads(self, cursor, rows: List[Tuple], created_at: str) -> int:
+        """Insert a batch of lead tuples on an open cursor, returning how many were new"""
+        # Unique indexes on the normalized columns reject duplicates (including
+        # repeats within the batch), so the whole batch goes through one
+        # executemany without per-row SELECTs
+        cursor.executemany(INSERT_LEAD_SQL, list(self._insert_params(rows, created_at)))
+        
+        return cursor.rowcount
+    
+    def _insert_params(self, rows: Iterable[Tuple], created_at: str) -> Iterator[Tuple]:
+        """INSERT_LEAD_SQL parameters for LEAD_FIELDS-ordered rows, adding the *_norm values"""
+        for row in rows:
+            yield (
+                *row,
+                *(fold_case(row[position]) for position in NORMALIZED_FIELD_POSITIONS),
+                created_at, created_at
+            )
+    
+    def _log_dedup(self, cursor, operation_type: str, total_processed: int,
+                   duplicates_found: int, final_count: int,
+                   duplicates_removed: Optional[int] = None):
+        """
+        Record the outcome of an insert or cleanup in deduplication_log
+        
+        duplicates_removed defaults to duplicates_found, since inserts skip
+        every duplicate they find.
+        """
+        if duplicates_removed is None:
+            duplicates_removed = duplicates_found
+        cursor.execute("""
+            INSERT INTO deduplication_log (
+                operation_type, total_leads, duplicates_found, 
+                duplicates_removed, final_count
+            ) VALUES (?, ?, ?, ?, ?)
+        """, (
+            operation_type, total_processed, duplicates_found,
+            duplicates_removed, final_count
+        ))
     
     def get_leads(self, filters: Optional[Dict] = None, limit: Optional[int] = None) -> List[Dict]:
         """
@@ -266,76 +621,98 @@ class LeadDatabase:
             List of lead dictionaries
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Build query
-                query = "SELECT * FROM leads WHERE 1=1"
-                params = []
-                
-                if filters:
-                    if filters.get('city'):
-                        query += " AND city LIKE ?"
-                        params.append(f"%{filters['city']}%")
-                    
-                    if filters.get('country'):
-                        query += " AND country LIKE ?"
-                        params.append(f"%{filters['country']}%")
-                    
-                    if filters.get('niche'):
-                        query += " AND niche LIKE ?"
-                        params.append(f"%{filters['niche']}%")
-                    
-                    if filters.get('source'):
-                        query += " AND source = ?"
-                        params.append(filters['source'])
-                
-                query += " ORDER BY created_at DESC"
-                
-                if limit:
-                    query += " LIMIT ?"
-                    params.append(limit)
-                
-                cursor.execute(query, params)
-                columns = [description[0] for description in cursor.description]
-                results = cursor.fetchall()
-                
-                # Convert to list of dictionaries
-                leads = []
-                for row in results:
-                    lead_dict = dict(zip(columns, row))
-                    leads.append(lead_dict)
-                
-                return leads
+            # Convert to list of dictionaries
+            return [dict(row) for row in self.iter_leads(filters, limit)]
                 
         except Exception as e:
             logger.error(f"Error retrieving leads: {e}")
             return []
     
+    def iter_leads(self, filters: Optional[Dict] = None, limit: Optional[int] = None,
+                   columns: Optional[List[str]] = None) -> Iterator[sqlite3.Row]:
+        """
+        Stream leads from the database without building a full result list
+        
+        Args:
+            filters: Dictionary of filters (city, country, niche, source)
+            limit: Maximum number of leads to return
+            columns: Columns to select (default: LEAD_COLUMNS)
+            
+        Yields:
+            sqlite3.Row objects, usable as tuples or by column name
+        """
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.arraysize = 1000
+            
+            query, params = self._build_leads_query(filters, limit, columns)
+            cursor.execute(query, params)
+            
+            batch = cursor.fetchmany()
+            while batch:
+                yield from batch
+                batch = cursor.fetchmany()
+        finally:
+            conn.close()
+    
+    def _build_leads_query(self, filters: Optional[Dict] = None, limit: Optional[int] = None,
+                           columns: Optional[List[str]] = None) -> Tuple[str, List]:
+        """Build the filtered leads SELECT and its parameters"""
+        select = ', '.join(columns or LEAD_COLUMNS)
+        query = f"SELECT {select} FROM leads WHERE 1=1"
+        params = []
+        
+        if filters:
+            text_fields = [field for field in TEXT_FILTER_FIELDS if filters.get(field)]
+            
+            if text_fields and self.fts_enabled:
+                # Substring matches resolved through the trigram index
+                conditions = " AND ".join(f"{field} LIKE ?" for field in text_fields)
+                query += f" AND id IN (SELECT rowid FROM leads_fts WHERE {conditions})"
+            else:
+                for field in text_fields:
+                    query += f" AND {field} LIKE ?"
+            params.extend(f"%{filters[field]}%" for field in text_fields)
+            
+            if filters.get('source'):
+                query += " AND source = ?"
+                params.append(filters['source'])
+        
+        query += " ORDER BY created_at DESC"
+        
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        return query, params
+    
     def get_lead_stats(self) -> Dict:
         """Get lead statistics"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
-                # Total leads
-                cursor.execute("SELECT COUNT(*) FROM leads")
+                # Total leads (every lead has exactly one source row)
+                cursor.execute("""
+                    SELECT COALESCE(SUM(count), 0) FROM lead_stats 
+                    WHERE dimension = 'source'
+                """)
                 total_leads = cursor.fetchone()[0]
                 
                 # Leads by source
                 cursor.execute("""
-                    SELECT source, COUNT(*) as count 
-                    FROM leads 
-                    GROUP BY source 
+                    SELECT key, count FROM lead_stats 
+                    WHERE dimension = 'source' AND count > 0 
                     ORDER BY count DESC
                 """)
                 leads_by_source = dict(cursor.fetchall())
                 
                 # Leads by city
                 cursor.execute("""
-                    SELECT city, COUNT(*) as count 
-                    FROM leads 
-                    GROUP BY city 
+                    SELECT key, count FROM lead_stats 
+                    WHERE dimension = 'city' AND count > 0 
                     ORDER BY count DESC 
                     LIMIT 10
                 """)
@@ -343,9 +720,8 @@ class LeadDatabase:
                 
                 # Leads by niche
                 cursor.execute("""
-                    SELECT niche, COUNT(*) as count 
-                    FROM leads 
-                    GROUP BY niche 
+                    SELECT key, count FROM lead_stats 
+                    WHERE dimension = 'niche' AND count > 0 
                     ORDER BY count DESC 
                     LIMIT 10
                 """)
@@ -382,33 +758,28 @@ class LeadDatabase:
             Path to exported CSV file
         """
         try:
-            leads = self.get_leads(filters)
-            
-            if not leads:
-                raise ValueError("No leads found to export")
-            
-            # Create DataFrame
-            df = pd.DataFrame(leads)
-            
-            # Select relevant columns for export
-            export_columns = [
-                'name', 'address', 'city', 'country', 'niche', 
-                'phone', 'email', 'website', 'source', 'scraped_at'
-            ]
-            
-            # Filter columns that exist
-            available_columns = [col for col in export_columns if col in df.columns]
-            df_export = df[available_columns]
-            
             # Generate filename if not provided
             if not filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"leads_export_{timestamp}.csv"
             
-            # Export to CSV
-            df_export.to_csv(filename, index=False, encoding='utf-8')
+            # Stream rows straight to the file instead of materializing the
+            # whole result set
+            leads = self.iter_leads(filters, columns=LEAD_FIELDS)
+            first_lead = next(leads, None)
+            
+            if first_lead is None:
+                raise ValueError("No leads found to export")
             
-            logger.info(f"Exported {len(df_export)} leads to {filename}")
+            exported = 0
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                writer.writerow(LEAD_FIELDS)
+                for lead in chain([first_lead], leads):
+                    writer.writerow(lead)
+                    exported += 1
+            
+            logger.info(f"Exported {exported} leads to {filename}")
             return filename
             
         except Exception as e:
@@ -423,64 +794,30 @@ class LeadDatabase:
             Tuple of (duplicates_found, duplicates_removed)
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
-                # Find duplicates by name + address
-                cursor.execute("""
-                    SELECT name_hash, address_hash, COUNT(*) as count
-                    FROM leads 
-                    GROUP BY name_hash, address_hash 
-                    HAVING count > 1
-                """)
-                name_address_duplicates = cursor.fetchall()
-                
-                # Find duplicates by email + phone
-                cursor.execute("""
-                    SELECT email_hash, phone_hash, COUNT(*) as count
-                    FROM leads 
-                    WHERE email_hash != '' AND phone_hash != ''
-                    GROUP BY email_hash, phone_hash 
-                    HAVING count > 1
-                """)
-                email_phone_duplicates = cursor.fetchall()
-                
-                duplicates_found = len(name_address_duplicates) + len(email_phone_duplicates)
-                duplicates_removed = 0
-                
-                # Remove duplicates (keep the oldest record)
-                for name_hash, address_hash, count in name_address_duplicates:
-                    cursor.execute("""
-                        DELETE FROM leads 
-                        WHERE name_hash = ? AND address_hash = ? 
-                        AND id NOT IN (
-                            SELECT MIN(id) FROM leads 
-                            WHERE name_hash = ? AND address_hash = ?
+                # Count duplicate groups for each unique key
+                duplicates_found = 0
+                for columns, condition in UNIQUE_KEYS:
+                    cursor.execute(f"""
+                        SELECT COUNT(*) FROM (
+                            SELECT 1 FROM leads 
+                            WHERE {condition}
+                            GROUP BY {columns} 
+                            HAVING COUNT(*) > 1
                         )
-                    """, (name_hash, address_hash, name_hash, address_hash))
-                    duplicates_removed += cursor.rowcount
+                    """)
+                    duplicates_found += cursor.fetchone()[0]
                 
-                for email_hash, phone_hash, count in email_phone_duplicates:
-                    cursor.execute("""
-                        DELETE FROM leads 
-                        WHERE email_hash = ? AND phone_hash = ? 
-                        AND id NOT IN (
-                            SELECT MIN(id) FROM leads 
-                            WHERE email_hash = ? AND phone_hash = ?
-                        )
-                    """, (email_hash, phone_hash, email_hash, phone_hash))
-                    duplicates_removed += cursor.rowcount
+                # Remove duplicates, keeping the oldest record of each group
+                duplicates_removed = self._delete_duplicates(cursor)
                 
                 # Log cleanup operation
-                cursor.execute("""
-                    INSERT INTO deduplication_log (
-                        operation_type, total_leads, duplicates_found, 
-                        duplicates_removed, final_count
-                    ) VALUES (?, ?, ?, ?, ?)
-                """, (
-                    'cleanup_duplicates', 0, duplicates_found,
-                    duplicates_removed, 0
-                ))
+                self._log_dedup(
+                    cursor, 'cleanup_duplicates', 0,
+                    duplicates_found, 0, duplicates_removed
+                )
                 
                 conn.commit()
                 logger.info(f"Cleaned up {duplicates_removed} duplicates")
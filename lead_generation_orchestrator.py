@@ -4,18 +4,69 @@ Coordinates multiple scrapers and manages the lead generation process
 """
 
 import asyncio
+import re
+import string
 import threading
 import time
-from typing import List, Dict, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Tuple, Union
 import logging
 from tqdm import tqdm
 
 from scrapers import GoogleMapsScraper, YelpScraper, YellowPagesScraper, TestScraper
-from lead_database_enhanced import LeadDatabase
+from lead_database_enhanced import LeadDatabase, fold_case
+
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:
+    MinHash = MinHashLSH = None
 
 logger = logging.getLogger(__name__)
 
+# Estimated Jaccard similarity of name+address trigrams at which two leads
+# count as the same business, and MinHash permutations per signature
+FUZZY_DEDUP_THRESHOLD = 0.85
+FUZZY_DEDUP_NUM_PERM = 64
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+# Deletes punctuation and whitespace in one str.translate pass
+CANONICAL_TABLE = str.maketrans('', '', string.punctuation + string.whitespace)
+
+def canonicalize(text: Optional[str]) -> str:
+    """Case-fold text and drop punctuation and whitespace, for exact-match keys"""
+    return fold_case(text).translate(CANONICAL_TABLE) if text else ''
+
+# Static scraper metadata for the UI, built once and shared read-only
+AVAILABLE_SOURCES = ('Google Maps', 'Yelp', 'Yellow Pages', 'Test Scraper')
+
+SOURCE_INFO = MappingProxyType({
+    'google_maps': MappingProxyType({
+        'name': 'Google Maps',
+        'description': 'Business listings from Google Maps',
+        'rate_limit': '2.0s',
+        'reliability': 'High'
+    }),
+    'yelp': MappingProxyType({
+        'name': 'Yelp',
+        'description': 'Business reviews and listings from Yelp',
+        'rate_limit': '1.5s',
+        'reliability': 'High'
+    }),
+    'yellowpages': MappingProxyType({
+        'name': 'Yellow Pages',
+        'description': 'Traditional business directory listings',
+        'rate_limit': '1.2s',
+        'reliability': 'Medium'
+    }),
+    'test': MappingProxyType({
+        'name': 'Test Scraper',
+        'description': 'Mock data for testing (always works)',
+        'rate_limit': '0.1s',
+        'reliability': 'High'
+    })
+})
+
 class LeadGenerationOrchestrator:
     """Orchestrates lead generation from multiple sources"""
     
@@ -43,12 +94,46 @@ class LeadGenerationOrchestrator:
                       limit: int = 50,
                       sources: Optional[List[str]] = None,
                       progress_callback: Optional[callable] = None,
-                      deduplicate: bool = True,
+                      deduplicate: Union[bool, str] = True,
                       address: Optional[str] = None,
                       user_id: Optional[int] = None) -> Dict:
         """
         Generate leads from multiple sources
         
+        Synchronous wrapper around generate_leads_async. Callers already
+        inside an event loop (Jupyter, an async web handler) should await
+        that directly; called from one anyway, this runs the coroutine on
+        its own loop in a worker thread, blocking the caller's loop until
+        it finishes.
+        """
+        coroutine = self.generate_leads_async(
+            city, country, niche, business_name, limit, sources,
+            progress_callback, deduplicate, address, user_id
+        )
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        
+        # asyncio.run refuses to start inside a running loop
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
+    
+    async def generate_leads_async(self, 
+                                   city: str, 
+                                   country: str, 
+                                   niche: str, 
+                                   business_name: Optional[str] = None,
+                                   limit: int = 50,
+                                   sources: Optional[List[str]] = None,
+                                   progress_callback: Optional[callable] = None,
+                                   deduplicate: Union[bool, str] = True,
+                                   address: Optional[str] = None,
+                                   user_id: Optional[int] = None) -> Dict:
+        """
+        Generate leads from multiple sources concurrently
+        
         Args:
             city: City to search in
             country: Country to search in
@@ -57,6 +142,8 @@ class LeadGenerationOrchestrator:
             limit: Maximum number of leads to generate
             sources: List of sources to use (default: all)
             progress_callback: Optional callback for progress updates
+            deduplicate: True for exact-match deduplication, "fuzzy" to also
+                drop near-duplicates (needs datasketch), False to keep all
             
         Returns:
             Dictionary with results summary
@@ -91,57 +178,75 @@ class LeadGenerationOrchestrator:
         try:
             logger.info(f"Starting lead generation for {niche} in {city}, {country}")
             
-            # Run scrapers in parallel
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                # Submit tasks
-                future_to_source = {}
-                for source in sources:
-                    if source in self.scrapers:
-                        future = executor.submit(
-                            self._run_scraper,
-                            source,
-                            city, country, niche, business_name, limit_per_source,
-                            progress_callback
-                        )
-                        future_to_source[future] = source
-                
-                # Collect results
-                for future in as_completed(future_to_source):
-                    source = future_to_source[future]
-                    try:
-                        result = future.result()
-                        self.results[source] = result
-                    except Exception as e:
-                        logger.error(f"Error in {source} scraper: {e}")
-                        self.results[source] = {
-                            'leads': [],
-                            'error': str(e),
-                            'status': 'error'
-                        }
+            # Run scrapers concurrently on one event loop; scrapers use
+            # blocking HTTP, so each runs in a worker thread and hands its
+            # result to the queue as soon as it finishes
+            run_sources = [source for source in sources if source in self.scrapers]
+            finished = asyncio.Queue()
+            
+            async def produce(source: str):
+                try:
+                    outcome = await asyncio.to_thread(
+                        self._run_scraper,
+                        source,
+                        city, country, niche, business_name, limit_per_source,
+                        progress_callback
+                    )
+                except Exception as e:
+                    outcome = e
+                await finished.put((source, outcome))
+            
+            producers = [asyncio.create_task(produce(source)) for source in run_sources]
             
-            # Combine all results
-            all_leads = []
-            for source, result in self.results.items():
-                if result.get('status') == 'success':
-                    all_leads.extend(result.get('leads', []))
+            # Dedup state carried across sources, so each batch is checked
+            # against everything kept so far
+            seen = set()
+            lsh = None
+            if deduplicate == 'fuzzy' and MinHashLSH is not None:
+                lsh = MinHashLSH(threshold=FUZZY_DEDUP_THRESHOLD, num_perm=FUZZY_DEDUP_NUM_PERM)
             
-            # Deduplicate leads
-            deduplicated_leads = self._deduplicate_leads(all_leads) if deduplicate else all_leads
+            total_found = 0
+            total_kept = 0
+            successfully_inserted = 0
             
-            # Store in database
-            if self.db:
-                total_processed, duplicates_found, successfully_inserted = self.db.insert_leads(
-                    [lead.to_dict() for lead in deduplicated_leads]
-                )
-            else:
-                total_processed = len(deduplicated_leads)
-                duplicates_found = 0
-                successfully_inserted = 0
+            # Deduplicate and store each source's leads while the slower
+            # scrapers are still running
+            for _ in run_sources:
+                source, outcome = await finished.get()
+                
+                if isinstance(outcome, Exception):
+                    logger.error(f"Error in {source} scraper: {outcome}")
+                    outcome = {
+                        'leads': [],
+                        'error': str(outcome),
+                        'status': 'error'
+                    }
+                self.results[source] = outcome
+                
+                if outcome.get('status') != 'success':
+                    continue
+                
+                leads = outcome.get('leads', [])
+                total_found += len(leads)
+                
+                if deduplicate == 'fuzzy':
+                    leads = self._fuzzy_deduplicate_leads(leads, seen, lsh)
+                elif deduplicate:
+                    leads = self._deduplicate_leads(leads, seen)
+                
+                total_kept += len(leads)
+                if self.db and leads:
+                    _, _, inserted = await asyncio.to_thread(
+                        self.db.insert_lead_rows, [lead.to_row() for lead in leads]
+                    )
+                    successfully_inserted += inserted
+            
+            await asyncio.gather(*producers)
             
             # Prepare final results
             final_results = {
-                'total_found': len(all_leads),
-                'duplicates_removed': len(all_leads) - len(deduplicated_leads),
+                'total_found': total_found,
+                'duplicates_removed': total_found - total_kept,
                 'successfully_inserted': successfully_inserted,
                 'inserted': successfully_inserted,
                 'sources_used': sources,
@@ -198,87 +303,90 @@ class LeadGenerationOrchestrator:
                 'count': 0
             }
     
-    def _deduplicate_leads(self, leads: List) -> List:
-        """Deduplicate leads based on multiple criteria"""
+    def _deduplicate_leads(self, leads: List, seen: Optional[set] = None) -> List:
+        """
+        Deduplicate leads based on multiple criteria
+        
+        Pass the same seen set to later calls to also drop leads matching
+        earlier batches.
+        """
         if not leads:
             return []
         
-        seen = set()
+        if seen is None:
+            seen = set()
         deduplicated = []
         
         for lead in leads:
-            # Create unique identifier based on multiple fields
-            identifier_parts = []
-            
-            # Use name + address as primary identifier
-            if lead.name and lead.address:
-                identifier_parts.append(f"{lead.name.lower().strip()}|{lead.address.lower().strip()}")
+            name, address = canonicalize(lead.name), canonicalize(lead.address)
+            email, phone = canonicalize(lead.email), canonicalize(lead.phone)
             
-            # Use email + phone as secondary identifier
-            if lead.email and lead.phone:
-                identifier_parts.append(f"{lead.email.lower().strip()}|{lead.phone.strip()}")
+            # Name + address is the primary identifier; email and phone give
+            # a secondary one, so a lead matching an earlier one on either
+            # counts as a duplicate. Tagged tuples keep the kinds apart.
+            identifiers = []
+            if name and address:
+                identifiers.append(('name_address', name, address))
+            if email and phone:
+                identifiers.append(('email_phone', email, phone))
+            elif email:
+                identifiers.append(('email', email))
+            elif phone:
+                identifiers.append(('phone', phone))
             
-            # Use email only if available
-            elif lead.email:
-                identifier_parts.append(f"email|{lead.email.lower().strip()}")
-            
-            # Use phone only if available
-            elif lead.phone:
-                identifier_parts.append(f"phone|{lead.phone.strip()}")
-            
-            # Check if this lead is unique
-            is_unique = True
-            for identifier in identifier_parts:
-                if identifier in seen:
-                    is_unique = False
-                    break
-            
-            if is_unique:
-                # Add all identifiers to seen set
-                for identifier in identifier_parts:
-                    seen.add(identifier)
+            if not any(identifier in seen for identifier in identifiers):
+                seen.update(identifiers)
                 deduplicated.append(lead)
         
         return deduplicated
     
-    def get_available_sources(self) -> List[str]:
+    def _fuzzy_deduplicate_leads(self, leads: List, seen: Optional[set] = None,
+                                 lsh=None) -> List:
+        """
+        Deduplicate leads, also dropping near-duplicates of earlier leads
+        
+        Spelling variants such as "Joe's Pizza" and "Joes Pizza LLC" at the
+        same address slip past exact matching. Each lead's name and address
+        are reduced to a MinHash signature of character trigrams, and
+        MinHashLSH finds earlier leads with similar signatures without
+        comparing every pair. Falls back to exact matching when datasketch
+        is not installed.
+        
+        As with _deduplicate_leads, passing the same seen set and lsh index
+        to later calls carries the state across batches.
+        """
+        deduplicated = self._deduplicate_leads(leads, seen)
+        if MinHashLSH is None:
+            logger.warning("datasketch not installed, using exact deduplication")
+            return deduplicated
+        
+        if lsh is None:
+            lsh = MinHashLSH(threshold=FUZZY_DEDUP_THRESHOLD, num_perm=FUZZY_DEDUP_NUM_PERM)
+        unique = []
+        
+        for lead in deduplicated:
+            text = PUNCTUATION_PATTERN.sub('', f"{lead.name or ''} {lead.address or ''}".lower())
+            text = ' '.join(text.split())
+            shingles = {text[i:i + 3] for i in range(max(len(text) - 2, 1))}
+            
+            signature = MinHash(num_perm=FUZZY_DEDUP_NUM_PERM)
+            signature.update_batch([shingle.encode('utf-8') for shingle in shingles])
+            
+            if lsh.query(signature):
+                continue
+            lsh.insert(len(lsh.keys), signature)
+            unique.append(lead)
+        
+        return unique
+    
+    def get_available_sources(self) -> Tuple[str, ...]:
         """Get list of available scrapers"""
         # Return human-readable names for UI selection
-        return [
-            'Google Maps',
-            'Yelp',
-            'Yellow Pages',
-            'Test Scraper'
-        ]
+        return AVAILABLE_SOURCES
     
-    def get_source_info(self) -> Dict[str, Dict]:
+    def get_source_info(self) -> Mapping[str, Mapping[str, str]]:
         """Get information about each scraper"""
-        return {
-            'google_maps': {
-                'name': 'Google Maps',
-                'description': 'Business listings from Google Maps',
-                'rate_limit': '2.0s',
-                'reliability': 'High'
-            },
-            'yelp': {
-                'name': 'Yelp',
-                'description': 'Business reviews and listings from Yelp',
-                'rate_limit': '1.5s',
-                'reliability': 'High'
-            },
-            'yellowpages': {
-                'name': 'Yellow Pages',
-                'description': 'Traditional business directory listings',
-                'rate_limit': '1.2s',
-                'reliability': 'Medium'
-            },
-            'test': {
-                'name': 'Test Scraper',
-                'description': 'Mock data for testing (always works)',
-                'rate_limit': '0.1s',
-                'reliability': 'High'
-            }
-        }
+        return SOURCE_INFO
     
     def get_lead_stats(self) -> Dict:
         """Get lead statistics from database"""
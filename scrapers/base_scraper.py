@@ -3,23 +3,67 @@ Base scraper class for all lead generation scrapers
 Provides common functionality for retries, rate limiting, and data validation
 """
 
+import os
+import re
 import time
 import random
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib.parse import urlsplit
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from fake_useragent import UserAgent
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import logging
 
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Common phone number patterns, tried in order
+PHONE_PATTERNS = [
+    re.compile(r'\+?1?[-.\s]?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})'),
+    re.compile(r'\+?[0-9]{1,4}[-.\s]?[0-9]{1,4}[-.\s]?[0-9]{1,4}[-.\s]?[0-9]{1,4}'),
+]
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+
+# Emails and strictly formatted phone numbers in a single left-to-right
+# scan; the email branch comes first so the digits of an address are never
+# taken for a phone number. The loose phone pattern is left out, since it
+# would match stray digit runs such as "2004" or "11-50" ahead of a real
+# number later in the text; it is only tried when no strict match exists.
+CONTACT_PATTERN = re.compile(
+    f"(?P<email>{EMAIL_PATTERN.pattern})|(?P<phone>{PHONE_PATTERNS[0].pattern})"
+)
+
+# Keep-alive connections held per host by each scraper's session
+HTTP_POOL_SIZE = 32
+
+# On-disk cache of GET responses shared by all scrapers, and how long
+# entries stay fresh. The cache lives in LEADGEN_CACHE_DIR, defaulting to
+# the user's cache directory rather than the working directory;
+# requests-cache's SQLite backend adds the .sqlite suffix.
+HTTP_CACHE_DIR = os.getenv('LEADGEN_CACHE_DIR') or os.path.join(
+    os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'leadgen'
+)
+HTTP_CACHE_NAME = os.path.join(HTTP_CACHE_DIR, 'http_cache')
+HTTP_CACHE_EXPIRE_SECONDS = 3600
+
+# Requests a host's token bucket can release back to back after idling
+RATE_LIMIT_BURST = 2
+
+@dataclass(slots=True, frozen=True)
 class LeadData:
-    """Standardized lead data structure"""
+    """Standardized lead data structure (immutable and hashable once built)"""
     name: str
     address: str
     city: str
@@ -45,6 +89,55 @@ class LeadData:
             'source': self.source,
             'scraped_at': self.scraped_at or ''
         }
+    
+    def to_row(self) -> Tuple[str, ...]:
+        """Convert to a tuple in the database's column order (see LEAD_FIELDS)"""
+        return (
+            self.name or '', self.address or '', self.city or '',
+            self.country or '', self.niche or '', self.phone or '',
+            self.email or '', self.website or '', self.source or '',
+            self.scraped_at or ''
+        )
+
+class HostRateLimiter:
+    """
+    Thread-safe token bucket pacing requests to one host
+    
+    Tokens refill at `rate` per second up to `burst`. A caller that finds
+    the bucket empty reserves the next token and sleeps until it is due,
+    so concurrent callers queue up in order without holding the lock.
+    Scrapers that fetch pages on several threads still go through it, so
+    the threads overlap request latency without raising the request rate.
+    """
+    
+    def __init__(self, rate: float, burst: int = RATE_LIMIT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        
+        if wait:
+            time.sleep(wait)
+
+# One limiter per host, shared by every scraper in the process
+_host_limiters: Dict[str, HostRateLimiter] = {}
+_host_limiters_lock = threading.Lock()
+
+def get_host_limiter(host: str, rate: float) -> HostRateLimiter:
+    """Get the shared limiter for a host, creating it at `rate` if needed"""
+    with _host_limiters_lock:
+        if host not in _host_limiters:
+            _host_limiters[host] = HostRateLimiter(rate)
+        return _host_limiters[host]
 
 class BaseScraper(ABC):
     """Base class for all lead scrapers"""
@@ -66,7 +159,15 @@ class BaseScraper(ABC):
                 "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
             ]
         
-        self.session = requests.Session()
+        if requests_cache is not None:
+            self.session = requests_cache.CachedSession(
+                HTTP_CACHE_NAME,
+                backend='sqlite',
+                expire_after=HTTP_CACHE_EXPIRE_SECONDS,
+                allowable_methods=('GET',)
+            )
+        else:
+            self.session = requests.Session()
         self._setup_session()
     
     def _setup_session(self):
@@ -76,22 +177,25 @@ class BaseScraper(ABC):
             'User-Agent': ua_value,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            # gzip and deflate, plus br (and zstd) when the optional decoder
+            # packages are installed, since urllib3 only decodes those then
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
-    
-    def _get_random_delay(self) -> float:
-        """Get random delay between requests to avoid detection"""
-        base_delay = self.rate_limit_delay
-        return base_delay + random.uniform(0, base_delay * 0.5)
+        
+        # A larger pool lets concurrent fetches on this session reuse open
+        # connections instead of discarding them past the default of 10.
+        # Retries stay with tenacity on _make_request.
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
     def _rotate_user_agent(self):
         """Rotate user agent to avoid detection"""
         if self.ua:
             self.session.headers['User-Agent'] = self.ua.random
         elif self._random_ua:
-            import random
             self.session.headers['User-Agent'] = random.choice(self._random_ua)
     
     @retry(
@@ -102,8 +206,10 @@ class BaseScraper(ABC):
     def _make_request(self, url: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
         """Make HTTP request with retry logic"""
         try:
-            # Add random delay
-            time.sleep(self._get_random_delay())
+            # Wait for the host's rate limit, unless the response will come
+            # from the cache
+            if not self._is_cached(url, params):
+                get_host_limiter(urlsplit(url).netloc, 1 / self.rate_limit_delay).acquire()
             
             # Rotate user agent occasionally
             if random.random() < 0.3:
@@ -111,7 +217,8 @@ class BaseScraper(ABC):
             
             logger.info(f"Making request to {url} with params: {params}")
             response = self.session.get(url, params=params, timeout=30, **kwargs)
-            logger.info(f"Response status: {response.status_code}, content length: {len(response.content)}")
+            logger.info(f"Response status: {response.status_code}, content length: {len(response.content)}, "
+                        f"encoding: {response.headers.get('Content-Encoding', 'identity')}")
             response.raise_for_status()
             return response
             
@@ -119,6 +226,17 @@ class BaseScraper(ABC):
             logger.warning(f"Request failed for {self.name}: {e}")
             raise
     
+    def _is_cached(self, url: str, params: Optional[Dict] = None) -> bool:
+        """Check whether a GET for url/params has a fresh response in the HTTP cache"""
+        if requests_cache is None:
+            return False
+        
+        # An expired entry is refetched (or revalidated) over the network,
+        # so it has to count as a miss for rate limiting
+        request = self.session.prepare_request(requests.Request('GET', url, params=params))
+        cached = self.session.cache.get_response(self.session.cache.create_key(request))
+        return cached is not None and not cached.is_expired
+    
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text data"""
         if not text:
@@ -130,15 +248,8 @@ class BaseScraper(ABC):
         if not text:
             return None
         
-        import re
-        # Common phone number patterns
-        phone_patterns = [
-            r'\+?1?[-.\s]?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})',
-            r'\+?[0-9]{1,4}[-.\s]?[0-9]{1,4}[-.\s]?[0-9]{1,4}[-.\s]?[0-9]{1,4}',
-        ]
-        
-        for pattern in phone_patterns:
-            match = re.search(pattern, text)
+        for pattern in PHONE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(0).strip()
         return None
@@ -148,19 +259,54 @@ class BaseScraper(ABC):
         if not text:
             return None
         
-        import re
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        match = re.search(email_pattern, text)
+        match = EMAIL_PATTERN.search(text)
         return match.group(0) if match else None
     
+    def _extract_contacts(self, text: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Extract the first phone number and email from text
+        
+        Phone numbers are looked for in the same order as _extract_phone:
+        the strict pattern over the whole text first, then the loose ones.
+        """
+        phone = email = None
+        if not text:
+            return phone, email
+        
+        for match in CONTACT_PATTERN.finditer(text):
+            if match.lastgroup == 'email':
+                email = email or match.group('email')
+            else:
+                phone = phone or match.group('phone').strip()
+            if phone and email:
+                break
+        
+        if phone is None:
+            for pattern in PHONE_PATTERNS[1:]:
+                match = pattern.search(text)
+                if match:
+                    phone = match.group(0).strip()
+                    break
+        return phone, email
+    
     def _validate_lead(self, lead: LeadData) -> bool:
         """Validate lead data before returning"""
-        return (
-            lead.name and len(lead.name.strip()) > 2 and
-            lead.address and len(lead.address.strip()) > 5 and
-            lead.city and len(lead.city.strip()) > 1 and
-            lead.country and len(lead.country.strip()) > 1 and
-            lead.niche and len(lead.niche.strip()) > 2
+        return self._has_valid_fields(lead.name, lead.address, lead.city, lead.country, lead.niche)
+    
+    def _has_valid_fields(self, name: str, address: str, city: str,
+                          country: str, niche: str) -> bool:
+        """
+        Validate raw lead fields
+        
+        Scrapers call this before building LeadData, so rejected listings
+        never allocate a lead object.
+        """
+        return bool(
+            name and len(name.strip()) > 2 and
+            address and len(address.strip()) > 5 and
+            city and len(city.strip()) > 1 and
+            country and len(country.strip()) > 1 and
+            niche and len(niche.strip()) > 2
         )
     
     @abstractmethod
@@ -5,11 +5,29 @@ Uses Google Maps search results to extract business information
 
 import re
 import json
+from datetime import datetime
 from typing import Dict, List, Optional
 from bs4 import BeautifulSoup
+import soupsieve as sv
 import logging
 from .base_scraper import BaseScraper, LeadData
 
+# orjson parses the embedded JSON-LD blobs several times faster
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Result containers and the fields inside them, each compiled once as a
+# single selector list so the tree is walked once instead of per selector
+RESULT_SELECTOR = sv.compile('[data-result-index], .Nv2PK, .THOPZb, .VkpGBb, .lI9IFe')
+NAME_SELECTOR = sv.compile(
+    '.fontHeadlineSmall, .fontHeadlineMedium, .fontHeadlineLarge, h3, .qBF1Pd, .fontTitleMedium'
+)
+ADDRESS_SELECTOR = sv.compile('.W4Efsd, .fontBodyMedium, .fontBodySmall')
+PHONE_LINK_SELECTOR = sv.compile('[href^="tel:"]')
+WEBSITE_LINK_SELECTOR = sv.compile('[href^="http"]')
+
 class GoogleMapsScraper(BaseScraper):
     """Scraper for Google Maps business listings"""
     
@@ -47,13 +65,18 @@ class GoogleMapsScraper(BaseScraper):
             
             # Make request
             response = self._make_request(self.base_url, params=params)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # lxml's C parser is several times faster than html.parser on
+            # result pages this size
+            soup = BeautifulSoup(response.content, 'lxml')
+            
+            # One timestamp for every lead found on this page
+            scraped_at = self._get_timestamp()
             
             # Extract business data from JSON-LD structured data
-            leads.extend(self._extract_from_json_ld(soup, city, country, niche))
+            leads.extend(self._extract_from_json_ld(soup, city, country, niche, scraped_at))
             
             # Extract from HTML content
-            leads.extend(self._extract_from_html(soup, city, country, niche))
+            leads.extend(self._extract_from_html(soup, city, country, niche, scraped_at))
             
             # Limit results
             leads = leads[:limit]
@@ -65,7 +88,8 @@ class GoogleMapsScraper(BaseScraper):
         
         return leads
     
-    def _extract_from_json_ld(self, soup: BeautifulSoup, city: str, country: str, niche: str) -> List[LeadData]:
+    def _extract_from_json_ld(self, soup: BeautifulSoup, city: str, country: str, niche: str,
+                              scraped_at: str) -> List[LeadData]:
         """Extract business data from JSON-LD structured data"""
         leads = []
         
@@ -75,18 +99,20 @@ class GoogleMapsScraper(BaseScraper):
             
             for script in scripts:
                 try:
-                    data = json.loads(script.string)
+                    # orjson only accepts a plain str, not bs4's NavigableString
+                    data = json_loads(script.get_text())
                     
                     if isinstance(data, dict):
-                        lead = self._parse_json_ld_business(data, city, country, niche)
-                        if lead and self._validate_lead(lead):
+                        lead = self._parse_json_ld_business(data, city, country, niche, scraped_at)
+                        if lead:
                             leads.append(lead)
                     elif isinstance(data, list):
                         for item in data:
-                            lead = self._parse_json_ld_business(item, city, country, niche)
-                            if lead and self._validate_lead(lead):
+                            lead = self._parse_json_ld_business(item, city, country, niche, scraped_at)
+                            if lead:
                                 leads.append(lead)
                                 
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError
                 except (json.JSONDecodeError, KeyError, TypeError):
                     continue
                     
@@ -95,7 +121,8 @@ class GoogleMapsScraper(BaseScraper):
         
         return leads
     
-    def _parse_json_ld_business(self, data: Dict, city: str, country: str, niche: str) -> Optional[LeadData]:
+    def _parse_json_ld_business(self, data: Dict, city: str, country: str, niche: str,
+                                scraped_at: str) -> Optional[LeadData]:
         """Parse business data from JSON-LD"""
         try:
             # Check if this is a business/organization
@@ -119,20 +146,25 @@ class GoogleMapsScraper(BaseScraper):
                 elif isinstance(addr, str):
                     address = addr
             
-            # Extract contact info
-            phone = data.get('telephone', '')
-            website = data.get('url', '')
-            email = data.get('email', '')
-            
             # If no address found, try to construct from location
             if not address and 'geo' in data:
                 geo = data['geo']
                 if isinstance(geo, dict) and 'latitude' in geo and 'longitude' in geo:
                     address = f"Coordinates: {geo['latitude']}, {geo['longitude']}"
             
+            name = self._clean_text(name)
+            address = self._clean_text(address) or f"{city}, {country}"
+            if not self._has_valid_fields(name, address, city, country, niche):
+                return None
+            
+            # Extract contact info
+            phone = data.get('telephone', '')
+            website = data.get('url', '')
+            email = data.get('email', '')
+            
             return LeadData(
-                name=self._clean_text(name),
-                address=self._clean_text(address) or f"{city}, {country}",
+                name=name,
+                address=address,
                 city=city,
                 country=country,
                 niche=niche,
@@ -140,96 +172,74 @@ class GoogleMapsScraper(BaseScraper):
                 email=self._extract_email(email) if email else None,
                 website=website if website else None,
                 source="Google Maps",
-                scraped_at=self._get_timestamp()
+                scraped_at=scraped_at
             )
             
         except Exception as e:
             self._logger.warning(f"Error parsing JSON-LD business: {e}")
             return None
     
-    def _extract_from_html(self, soup: BeautifulSoup, city: str, country: str, niche: str) -> List[LeadData]:
+    def _extract_from_html(self, soup: BeautifulSoup, city: str, country: str, niche: str,
+                           scraped_at: str) -> List[LeadData]:
         """Extract business data from HTML content"""
         leads = []
         
         try:
-            # Look for business listings in various containers
-            selectors = [
-                '[data-result-index]',
-                '.Nv2PK',
-                '.THOPZb',
-                '.VkpGBb',
-                '.lI9IFe'
-            ]
-            
-            for selector in selectors:
-                elements = soup.select(selector)
-                
-                for element in elements:
-                    lead = self._parse_html_business(element, city, country, niche)
-                    if lead and self._validate_lead(lead):
-                        leads.append(lead)
-                        
+            # Look for business listings in various containers; each element
+            # is visited once even if it matches several container classes
+            for element in RESULT_SELECTOR.select(soup):
+                lead = self._parse_html_business(element, city, country, niche, scraped_at)
+                if lead:
+                    leads.append(lead)
+                    
         except Exception as e:
             self._logger.warning(f"Error extracting HTML data: {e}")
         
         return leads
     
-    def _parse_html_business(self, element, city: str, country: str, niche: str) -> Optional[LeadData]:
+    def _parse_html_business(self, element, city: str, country: str, niche: str,
+                             scraped_at: str) -> Optional[LeadData]:
         """Parse business data from HTML element"""
         try:
-            # Extract business name
-            name_selectors = [
-                '.fontHeadlineSmall',
-                '.fontHeadlineMedium', 
-                '.fontHeadlineLarge',
-                'h3',
-                '.qBF1Pd',
-                '.fontTitleMedium'
-            ]
-            
+            # Extract business name (first non-empty match in document order)
             name = ""
-            for selector in name_selectors:
-                name_elem = element.select_one(selector)
-                if name_elem and name_elem.get_text(strip=True):
-                    name = name_elem.get_text(strip=True)
+            for name_elem in NAME_SELECTOR.iselect(element):
+                name = name_elem.get_text(strip=True)
+                if name:
                     break
             
             if not name:
                 return None
             
             # Extract address
-            address_selectors = [
-                '.W4Efsd',
-                '.W4Efsd:last-child',
-                '.fontBodyMedium',
-                '.fontBodySmall'
-            ]
-            
             address = ""
-            for selector in address_selectors:
-                addr_elem = element.select_one(selector)
-                if addr_elem:
-                    addr_text = addr_elem.get_text(strip=True)
-                    # Check if this looks like an address
-                    if any(word in addr_text.lower() for word in ['street', 'st', 'avenue', 'ave', 'road', 'rd', 'drive', 'dr']):
-                        address = addr_text
-                        break
+            for addr_elem in ADDRESS_SELECTOR.iselect(element):
+                addr_text = addr_elem.get_text(strip=True)
+                # Check if this looks like an address
+                if any(word in addr_text.lower() for word in ['street', 'st', 'avenue', 'ave', 'road', 'rd', 'drive', 'dr']):
+                    address = addr_text
+                    break
+            
+            name = self._clean_text(name)
+            address = self._clean_text(address) or f"{city}, {country}"
+            if not self._has_valid_fields(name, address, city, country, niche):
+                return None
             
             # Extract phone
             phone = ""
-            phone_elem = element.select_one('[href^="tel:"]')
+            phone_elem = PHONE_LINK_SELECTOR.select_one(element)
             if phone_elem:
                 phone = phone_elem.get('href', '').replace('tel:', '')
             
             # Extract website
             website = ""
-            website_elem = element.select_one('[href^="http"]')
+            website_elem = WEBSITE_LINK_SELECTOR.select_one(element)
             if website_elem:
                 website = website_elem.get('href', '')
             
             return LeadData(
-                name=self._clean_text(name),
-                address=self._clean_text(address) or f"{city}, {country}",
+                name=name,
+                address=address,
                 city=city,
                 country=country,
                 niche=niche,
@@ -237,7 +247,7 @@ class GoogleMapsScraper(BaseScraper):
                 email=None,  # Rarely available in Google Maps HTML
                 website=website if website else None,
                 source="Google Maps",
-                scraped_at=self._get_timestamp()
+                scraped_at=scraped_at
             )
             
         except Exception as e:
@@ -246,5 +256,4 @@ class GoogleMapsScraper(BaseScraper):
     
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
-        from datetime import datetime
         return datetime.now().isoformat()
@@ -5,11 +5,117 @@ Uses Bing search to find LinkedIn company pages
 """
 
 import re
-from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
 from urllib.parse import quote_plus, urljoin
 from .base_scraper import BaseScraper, LeadData
 
+logger = logging.getLogger(__name__)
+
+# Company pages fetched at once
+COMPANY_PAGE_WORKERS = 8
+
+# Company-page hrefs read straight from the raw Bing results page
+COMPANY_HREF_PATTERN = re.compile(
+    rb'href=["\'](https?://(?:[a-z0-9-]+\.)?linkedin\.com/company/[^?#\s"\']+)', re.IGNORECASE
+)
+
+# Fallback when the raw scan finds nothing: only company-page links are
+# kept when parsing the page, so the rest of it never becomes a tree
+COMPANY_LINK_STRAINER = SoupStrainer('a', href=re.compile(r'linkedin\.com/company/'))
+COMPANY_LINK_SELECTOR = sv.compile('a[href*="linkedin.com/company"]')
+
+# Company page URL without its query string
+COMPANY_URL_PATTERN = re.compile(r'https?://(?:[a-z0-9-]+\.)?linkedin\.com/company/[^?#\s"\']+', re.IGNORECASE)
+
+# One grouped selector per field, compiled once at import; a grouped
+# selector walks the page once and yields matches in document order
+NAME_SELECTOR = sv.compile(
+    'h1, .org-top-card-summary__title, .org-top-card-summary__title h1, '
+    '.top-card-layout__title, .company-name'
+)
+
+DESCRIPTION_SELECTOR = sv.compile(
+    '.org-top-card-summary__tagline, .org-top-card-summary__info-item, '
+    '.company-description, .top-card-layout__headline'
+)
+
+WEBSITE_SELECTOR = sv.compile(
+    'a[href^="http"]:not([href*="linkedin.com"]), '
+    '.org-top-card-summary__website a, .company-website a'
+)
+
+LOCATION_SELECTOR = sv.compile(
+    '.org-top-card-summary__info-item, .company-location, .top-card-layout__first-subline'
+)
+
+INFO_SELECTOR = sv.compile(
+    '.org-top-card-summary__info-item, .company-info, .top-card-layout__second-subline'
+)
+
+# Union of all the field selectors: the page is walked once with this, and
+# each hit is then matched against the per-field selectors above
+COMPANY_FIELDS_SELECTOR = sv.compile(', '.join(
+    selector.pattern
+    for selector in (NAME_SELECTOR, DESCRIPTION_SELECTOR, WEBSITE_SELECTOR, LOCATION_SELECTOR, INFO_SELECTOR)
+))
+
+# Words that mark a text as a location, found in one pass over the text
+LOCATION_KEYWORD_PATTERN = re.compile(
+    '|'.join(('city', 'state', 'country', 'united states', 'usa', 'canada', 'uk', 'australia'))
+)
+
+# Industries recognized in a company description, in order of preference
+INDUSTRY_KEYWORDS = ('technology', 'software', 'healthcare', 'finance', 'retail', 'manufacturing', 'consulting', 'services')
+
+def extract_company_fields(content: bytes) -> Optional[Tuple[str, str, str, str, str]]:
+    """
+    Parse a company page into (name, description, website, location, info)
+    
+    Returns None when the page has no company name.
+    """
+    soup = BeautifulSoup(content, 'lxml')
+    
+    # Fill every field in one walk over the tree. An element can feed more
+    # than one field (info items double as description and location), and
+    # the first match of a field wins, as with select_one.
+    name = description = website = None
+    location = ""
+    company_info = ""
+    for element in COMPANY_FIELDS_SELECTOR.iselect(soup):
+        text = element.get_text(strip=True)
+        
+        # Extract company name
+        if name is None and NAME_SELECTOR.match(element):
+            name = text
+        
+        # Extract company description/industry
+        if description is None and DESCRIPTION_SELECTOR.match(element):
+            description = text
+        
+        # Extract website
+        if website is None and WEBSITE_SELECTOR.match(element):
+            website = element.get('href', '')
+        
+        # Extract location/address, checking it looks like a location
+        if not location and LOCATION_SELECTOR.match(element):
+            if LOCATION_KEYWORD_PATTERN.search(text.lower()):
+                location = text
+        
+        # Extract company size/industry info
+        if INFO_SELECTOR.match(element):
+            if text and len(text) > 5:
+                company_info += text + " "
+    
+    if not name:
+        return None
+    
+    return name, description or "", website or "", location, company_info
+
 class LinkedInScraper(BaseScraper):
     """Scraper for LinkedIn business pages via Bing search"""
     
@@ -46,20 +152,23 @@ class LinkedInScraper(BaseScraper):
             
             # Make request
             response = self._make_request(self.base_url, params=params)
-            soup = BeautifulSoup(response.content, 'html.parser')
             
             # Extract LinkedIn company links
-            company_links = self._extract_company_links(soup)
+            company_links = self._extract_company_links(response.content)
             
-            # Scrape each company page
-            for link in company_links[:limit]:
-                try:
-                    lead = self._scrape_company_page(link, city, country, niche)
-                    if lead and self._validate_lead(lead):
+            # One timestamp for every lead found by this search
+            scraped_at = self._get_timestamp()
+            
+            # Scrape company pages concurrently (each call handles its own
+            # errors and returns None on failure)
+            with ThreadPoolExecutor(max_workers=COMPANY_PAGE_WORKERS) as executor:
+                scraped = executor.map(
+                    lambda link: self._scrape_company_page(link, city, country, niche, scraped_at),
+                    company_links[:limit]
+                )
+                for lead in scraped:
+                    if lead:
                         leads.append(lead)
-                except Exception as e:
-                    logger.warning(f"Error scraping company page {link}: {e}")
-                    continue
             
             logger.info(f"Found {len(leads)} leads from LinkedIn")
             
@@ -68,149 +177,66 @@ class LinkedInScraper(BaseScraper):
         
         return leads
     
-    def _extract_company_links(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_company_links(self, content: bytes) -> List[str]:
         """Extract LinkedIn company page links from Bing search results"""
-        links = []
+        # Insertion-ordered set: company links in page order, which is
+        # Bing's ranking
+        links = {}
         
         try:
-            # Look for search result links
-            result_selectors = [
-                '.b_algo h2 a',
-                '.b_title a',
-                '.b_caption a',
-                'h2 a[href*="linkedin.com/company"]'
-            ]
-            
-            for selector in result_selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    href = element.get('href', '')
-                    if 'linkedin.com/company/' in href:
-                        # Clean up the URL
-                        if '?' in href:
-                            href = href.split('?')[0]
-                        if href not in links:
-                            links.append(href)
-            
-            # Also look for general links that might be LinkedIn company pages
-            all_links = soup.select('a[href*="linkedin.com/company"]')
-            for link in all_links:
-                href = link.get('href', '')
-                if 'linkedin.com/company/' in href:
-                    if '?' in href:
-                        href = href.split('?')[0]
-                    if href not in links:
-                        links.append(href)
+            # The links are all that is needed, so scan the raw bytes and
+            # only parse the page if the scan comes up empty
+            for match in COMPANY_HREF_PATTERN.finditer(content):
+                links[match.group(1).decode('utf-8', 'replace')] = None
+            if links:
+                return list(links)
+            
+            soup = BeautifulSoup(content, 'lxml', parse_only=COMPANY_LINK_STRAINER)
+            for link in COMPANY_LINK_SELECTOR.iselect(soup):
+                match = COMPANY_URL_PATTERN.search(link.get('href', ''))
+                if match:
+                    links[match.group(0)] = None
                         
         except Exception as e:
             logger.warning(f"Error extracting company links: {e}")
         
-        return links
+        return list(links)
     
-    def _scrape_company_page(self, url: str, city: str, country: str, niche: str) -> Optional[LeadData]:
+    def _scrape_company_page(self, url: str, city: str, country: str, niche: str,
+                             scraped_at: str) -> Optional[LeadData]:
         """Scrape individual LinkedIn company page"""
         try:
             # Make request to company page
             response = self._make_request(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract company name
-            name_selectors = [
-                'h1',
-                '.org-top-card-summary__title',
-                '.org-top-card-summary__title h1',
-                '.top-card-layout__title',
-                '.company-name'
-            ]
-            
-            name = ""
-            for selector in name_selectors:
-                name_elem = soup.select_one(selector)
-                if name_elem:
-                    name = name_elem.get_text(strip=True)
-                    break
-            
-            if not name:
-                return None
             
-            # Extract company description/industry
-            description_selectors = [
-                '.org-top-card-summary__tagline',
-                '.org-top-card-summary__info-item',
-                '.company-description',
-                '.top-card-layout__headline'
-            ]
-            
-            description = ""
-            for selector in description_selectors:
-                desc_elem = soup.select_one(selector)
-                if desc_elem:
-                    description = desc_elem.get_text(strip=True)
-                    break
-            
-            # Extract website
-            website = ""
-            website_selectors = [
-                'a[href^="http"]:not([href*="linkedin.com"])',
-                '.org-top-card-summary__website a',
-                '.company-website a'
-            ]
-            
-            for selector in website_selectors:
-                website_elem = soup.select_one(selector)
-                if website_elem:
-                    website = website_elem.get('href', '')
-                    break
-            
-            # Extract location/address
-            location_selectors = [
-                '.org-top-card-summary__info-item',
-                '.company-location',
-                '.top-card-layout__first-subline'
-            ]
-            
-            location = ""
-            for selector in location_selectors:
-                loc_elem = soup.select_one(selector)
-                if loc_elem:
-                    loc_text = loc_elem.get_text(strip=True)
-                    # Check if this looks like a location
-                    if any(word in loc_text.lower() for word in ['city', 'state', 'country', 'united states', 'usa', 'canada', 'uk', 'australia']):
-                        location = loc_text
-                        break
-            
-            # Extract company size/industry info
-            company_info = ""
-            info_selectors = [
-                '.org-top-card-summary__info-item',
-                '.company-info',
-                '.top-card-layout__second-subline'
-            ]
-            
-            for selector in info_selectors:
-                info_elems = soup.select(selector)
-                for info_elem in info_elems:
-                    info_text = info_elem.get_text(strip=True)
-                    if info_text and len(info_text) > 5:
-                        company_info += info_text + " "
-            
-            # Try to extract phone/email from company info
-            phone = self._extract_phone(company_info)
-            email = self._extract_email(company_info)
+            # Parsed on this fetch thread; the other threads' requests wait on
+            # the network without the GIL, so they still overlap the parse
+            fields = extract_company_fields(response.content)
+            if fields is None:
+                return None
+            name, description, website, location, company_info = fields
             
             # Use description or company info to refine niche
             refined_niche = niche
             if description:
                 # Look for industry keywords in description
-                industry_keywords = ['technology', 'software', 'healthcare', 'finance', 'retail', 'manufacturing', 'consulting', 'services']
-                for keyword in industry_keywords:
-                    if keyword in description.lower():
+                description_lower = description.lower()
+                for keyword in INDUSTRY_KEYWORDS:
+                    if keyword in description_lower:
                         refined_niche = keyword.title()
                         break
             
+            name = self._clean_text(name)
+            address = self._clean_text(location) or f"{city}, {country}"
+            if not self._has_valid_fields(name, address, city, country, refined_niche):
+                return None
+            
+            # Try to extract phone/email from company info
+            phone, email = self._extract_contacts(company_info)
+            
             return LeadData(
-                name=self._clean_text(name),
-                address=self._clean_text(location) or f"{city}, {country}",
+                name=name,
+                address=address,
                 city=city,
                 country=country,
                 niche=refined_niche,
@@ -218,7 +244,7 @@ class LinkedInScraper(BaseScraper):
                 email=email,
                 website=website if website else None,
                 source="LinkedIn",
-                scraped_at=self._get_timestamp()
+                scraped_at=scraped_at
             )
             
         except Exception as e:
@@ -227,5 +253,4 @@ class LinkedInScraper(BaseScraper):
     
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
-        from datetime import datetime
         return datetime.now().isoformat()
@@ -2,9 +2,13 @@
 Test scraper that returns mock data to verify the system works
 """
 
+import logging
+from datetime import datetime
 from typing import Dict, List, Optional
 from .base_scraper import BaseScraper, LeadData
 
+logger = logging.getLogger(__name__)
+
 class TestScraper(BaseScraper):
     """Test scraper that returns mock data"""
     
@@ -20,27 +24,28 @@ class TestScraper(BaseScraper):
         """Return mock test data"""
         logger.info(f"Test scraper searching for: {niche} in {city}, {country}")
         
-        # Generate mock leads
-        mock_leads = []
-        for i in range(min(5, limit)):  # Return 5 test leads
-            lead = LeadData(
-                name=f"Test Business {i+1}",
-                address=f"{100+i} Main St, {city}, {country}",
+        # Generate mock leads (up to 5), all stamped with the same time
+        scraped_at = self._get_timestamp()
+        address_suffix = f"Main St, {city}, {country}"
+        mock_leads = [
+            LeadData(
+                name=f"Test Business {n}",
+                address=f"{99+n} {address_suffix}",
                 city=city,
                 country=country,
                 niche=niche,
-                phone=f"+1-555-{1000+i:04d}",
-                email=f"contact{i+1}@testbusiness{i+1}.com",
-                website=f"https://testbusiness{i+1}.com",
+                phone=f"+1-555-{999+n:04d}",
+                email=f"contact{n}@testbusiness{n}.com",
+                website=f"https://testbusiness{n}.com",
                 source="Test Scraper",
-                scraped_at=self._get_timestamp()
+                scraped_at=scraped_at
             )
-            mock_leads.append(lead)
+            for n in range(1, min(5, limit) + 1)
+        ]
         
         logger.info(f"Test scraper returning {len(mock_leads)} mock leads")
         return mock_leads
     
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
-        from datetime import datetime
         return datetime.now().isoformat()
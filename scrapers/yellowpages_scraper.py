@@ -4,12 +4,66 @@ Scrapes business listings from Yellow Pages search results
 """
 
 import re
-from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Set
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
 import logging
 from urllib.parse import quote_plus, urljoin
 from .base_scraper import BaseScraper, LeadData
 
+# Only listing containers and the pagination block are kept when parsing
+# a results page; the rest of the page never becomes a tree
+RESULTS_STRAINER = SoupStrainer(class_=re.compile(r'result|listing|v-card|pagination|next-page'))
+
+# Fallback selector lists, each tried in order; compiled once at import
+# instead of being parsed again for every listing
+LISTING_SELECTORS = tuple(sv.compile(selector) for selector in (
+    '.result',
+    '.search-result',
+    '.listing',
+    '.business-listing',
+    '.srp-listing',
+))
+
+# General listing card, used when none of LISTING_SELECTORS match
+CARD_SELECTOR = sv.compile('.v-card')
+
+# Listing fields use one grouped selector each, so a listing is walked
+# once per field and matches come back in document order
+NAME_SELECTOR = sv.compile(
+    'h2 a, .business-name a, h3 a, .listing-name a, .result-title a, '
+    'a[data-track="listing-name"]'
+)
+
+ADDRESS_SELECTOR = sv.compile(
+    '.adr, .street-address, .address, .location, .result-address, .listing-address'
+)
+
+PHONE_SELECTOR = sv.compile(
+    '[href^="tel:"], .phone, .phone-number, .result-phone, .listing-phone'
+)
+
+WEBSITE_SELECTOR = sv.compile(
+    'a[href*="http"]:not([href*="yellowpages.com"]), '
+    '.website-link a, .result-website a, .listing-website a'
+)
+
+EMAIL_SELECTOR = sv.compile('[href^="mailto:"], .email, .email-address')
+
+CATEGORY_SELECTOR = sv.compile(
+    '.categories a, .business-categories a, .listing-categories a, .result-categories a'
+)
+
+INFO_SELECTOR = sv.compile('.business-info, .listing-info, .result-info, .description')
+
+NEXT_PAGE_SELECTORS = tuple(sv.compile(selector) for selector in (
+    'a[aria-label="Next"]',
+    '.pagination a[href*="page="]',
+    '.next-page a',
+    'a[href*="page="]',
+))
+
 class YellowPagesScraper(BaseScraper):
     """Scraper for Yellow Pages business listings"""
     
@@ -46,14 +100,26 @@ class YellowPagesScraper(BaseScraper):
             
             # Make request
             response = self._make_request(self.base_url, params=params)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_results_page(response)
+            
+            # One timestamp for every lead found by this search
+            scraped_at = self._get_timestamp()
+            
+            # Niche words matched against each listing's categories
+            niche_tokens = frozenset(niche.lower().split())
+            
+            # Business page URLs already taken; sponsored listings repeat
+            # across result pages
+            seen_urls = set()
             
             # Extract business listings
-            leads.extend(self._extract_business_listings(soup, city, country, niche))
+            leads.extend(self._extract_business_listings(soup, city, country, niche, niche_tokens,
+                                                         seen_urls, scraped_at))
             
             # Try to get more results from pagination
             if len(leads) < limit:
-                leads.extend(self._scrape_additional_pages(soup, city, country, niche, limit - len(leads)))
+                leads.extend(self._scrape_additional_pages(soup, city, country, niche, niche_tokens,
+                                                           seen_urls, limit - len(leads), scraped_at))
             
             # Limit results
             leads = leads[:limit]
@@ -65,34 +131,35 @@ class YellowPagesScraper(BaseScraper):
         
         return leads
     
-    def _extract_business_listings(self, soup: BeautifulSoup, city: str, country: str, niche: str) -> List[LeadData]:
-        """Extract business listings from search results page"""
+    def _parse_results_page(self, response) -> BeautifulSoup:
+        """Parse a search results page; the only place a page becomes a tree"""
+        return BeautifulSoup(response.content, 'lxml', parse_only=RESULTS_STRAINER)
+    
+    def _extract_business_listings(self, soup: BeautifulSoup, city: str, country: str, niche: str,
+                                   niche_tokens: FrozenSet[str], seen_urls: Set[str],
+                                   scraped_at: str) -> List[LeadData]:
+        """Extract business listings from an already-parsed results page.
+        
+        The callee must not re-parse; listings are read from the given soup.
+        """
         leads = []
         
         try:
             # Look for business listing containers
-            listing_selectors = [
-                '.result',
-                '.search-result',
-                '.listing',
-                '.business-listing',
-                '.srp-listing'
-            ]
-            
             listings = []
-            for selector in listing_selectors:
-                elements = soup.select(selector)
+            for selector in LISTING_SELECTORS:
+                elements = selector.select(soup)
                 if elements:
                     listings = elements
                     break
             
             # If no specific selectors found, try general approach
             if not listings:
-                listings = soup.select('.v-card')
+                listings = CARD_SELECTOR.select(soup)
             
             for listing in listings:
-                lead = self._parse_business_listing(listing, city, country, niche)
-                if lead and self._validate_lead(lead):
+                lead = self._parse_business_listing(listing, city, country, niche, niche_tokens, seen_urls, scraped_at)
+                if lead:
                     leads.append(lead)
                     
         except Exception as e:
@@ -100,148 +167,92 @@ class YellowPagesScraper(BaseScraper):
         
         return leads
     
-    def _parse_business_listing(self, element, city: str, country: str, niche: str) -> Optional[LeadData]:
-        """Parse individual business listing"""
+    def _parse_business_listing(self, element, city: str, country: str, niche: str,
+                                niche_tokens: FrozenSet[str], seen_urls: Set[str],
+                                scraped_at: str) -> Optional[LeadData]:
+        """Parse individual business listing, skipping businesses in seen_urls"""
         try:
             # Extract business name
-            name_selectors = [
-                'h2 a',
-                '.business-name a',
-                'h3 a',
-                '.listing-name a',
-                '.result-title a',
-                'a[data-track="listing-name"]'
-            ]
-            
             name = ""
             business_url = ""
-            for selector in name_selectors:
-                name_elem = element.select_one(selector)
-                if name_elem:
-                    name = name_elem.get_text(strip=True)
-                    business_url = name_elem.get('href', '')
-                    break
+            name_elem = NAME_SELECTOR.select_one(element)
+            if name_elem:
+                name = name_elem.get_text(strip=True)
+                business_url = name_elem.get('href', '').split('?', 1)[0]
             
             if not name:
                 return None
             
-            # Extract address
-            address_selectors = [
-                '.adr',
-                '.street-address',
-                '.address',
-                '.location',
-                '.result-address',
-                '.listing-address'
-            ]
+            # Skip a business already listed earlier in this search
+            if business_url:
+                if business_url in seen_urls:
+                    return None
+                seen_urls.add(business_url)
             
+            # Extract address
             address = ""
-            for selector in address_selectors:
-                addr_elem = element.select_one(selector)
-                if addr_elem:
-                    addr_text = addr_elem.get_text(strip=True)
-                    # Clean up address text
-                    addr_text = re.sub(r'\s+', ' ', addr_text)
-                    if len(addr_text) > 10:  # Reasonable address length
-                        address = addr_text
-                        break
+            for addr_elem in ADDRESS_SELECTOR.iselect(element):
+                addr_text = addr_elem.get_text(strip=True)
+                # Clean up address text (collapses whitespace, so the
+                # address needs no second pass below)
+                addr_text = self._clean_text(addr_text)
+                if len(addr_text) > 10:  # Reasonable address length
+                    address = addr_text
+                    break
             
             # Extract phone number
             phone = ""
-            phone_selectors = [
-                '[href^="tel:"]',
-                '.phone',
-                '.phone-number',
-                '.result-phone',
-                '.listing-phone'
-            ]
-            
-            for selector in phone_selectors:
-                phone_elem = element.select_one(selector)
-                if phone_elem:
-                    phone_text = phone_elem.get_text(strip=True)
-                    if not phone_text and phone_elem.get('href'):
-                        phone_text = phone_elem.get('href', '').replace('tel:', '')
-                    phone = phone_text
-                    break
+            phone_elem = PHONE_SELECTOR.select_one(element)
+            if phone_elem:
+                phone = phone_elem.get_text(strip=True)
+                if not phone and phone_elem.get('href'):
+                    phone = phone_elem.get('href', '').replace('tel:', '')
             
             # Extract website
             website = ""
-            website_selectors = [
-                'a[href*="http"]:not([href*="yellowpages.com"])',
-                '.website-link a',
-                '.result-website a',
-                '.listing-website a'
-            ]
-            
-            for selector in website_selectors:
-                website_elem = element.select_one(selector)
-                if website_elem:
-                    href = website_elem.get('href', '')
-                    if href and not href.startswith('#'):
-                        website = href
-                        break
+            for website_elem in WEBSITE_SELECTOR.iselect(element):
+                href = website_elem.get('href', '')
+                if href and not href.startswith('#'):
+                    website = href
+                    break
             
             # Extract email (if available)
             email = ""
-            email_selectors = [
-                '[href^="mailto:"]',
-                '.email',
-                '.email-address'
-            ]
-            
-            for selector in email_selectors:
-                email_elem = element.select_one(selector)
-                if email_elem:
-                    email_text = email_elem.get_text(strip=True)
-                    if not email_text and email_elem.get('href'):
-                        email_text = email_elem.get('href', '').replace('mailto:', '')
-                    email = email_text
-                    break
+            email_elem = EMAIL_SELECTOR.select_one(element)
+            if email_elem:
+                email = email_elem.get_text(strip=True)
+                if not email and email_elem.get('href'):
+                    email = email_elem.get('href', '').replace('mailto:', '')
             
             # Extract categories/tags
-            categories = []
-            category_selectors = [
-                '.categories a',
-                '.business-categories a',
-                '.listing-categories a',
-                '.result-categories a'
-            ]
-            
-            for selector in category_selectors:
-                cat_elems = element.select(selector)
-                for cat_elem in cat_elems:
-                    cat_text = cat_elem.get_text(strip=True)
-                    if cat_text and len(cat_text) > 2 and cat_text not in categories:
-                        categories.append(cat_text)
+            categories = {}  # insertion-ordered set
+            for cat_elem in CATEGORY_SELECTOR.iselect(element):
+                cat_text = cat_elem.get_text(strip=True)
+                if cat_text and len(cat_text) > 2:
+                    categories[cat_text] = None
             
             # Use categories to refine niche if available
             refined_niche = niche
             if categories and niche.lower() not in ' '.join(categories).lower():
                 # Try to find a category that matches our niche
                 for cat in categories:
-                    if any(word in cat.lower() for word in niche.lower().split()):
+                    cat_lower = cat.lower()
+                    if any(word in cat_lower for word in niche_tokens):
                         refined_niche = cat
                         break
             
             # Extract additional business info
-            business_info = ""
-            info_selectors = [
-                '.business-info',
-                '.listing-info',
-                '.result-info',
-                '.description'
-            ]
+            info_elem = INFO_SELECTOR.select_one(element)
+            business_info = info_elem.get_text(strip=True) if info_elem else ""
             
-            for selector in info_selectors:
-                info_elem = element.select_one(selector)
-                if info_elem:
-                    business_info = info_elem.get_text(strip=True)
-                    break
+            name = self._clean_text(name)
+            address = address or f"{city}, {country}"
+            if not self._has_valid_fields(name, address, city, country, refined_niche):
+                return None
             
             return LeadData(
-                name=self._clean_text(name),
-                address=self._clean_text(address) or f"{city}, {country}",
+                name=name,
+                address=address,
                 city=city,
                 country=country,
                 niche=refined_niche,
@@ -249,29 +260,28 @@ class YellowPagesScraper(BaseScraper):
                 email=self._extract_email(email) if email else None,
                 website=website if website else None,
                 source="Yellow Pages",
-                scraped_at=self._get_timestamp()
+                scraped_at=scraped_at
             )
             
         except Exception as e:
             self._logger.warning(f"Error parsing business listing: {e}")
             return None
     
-    def _scrape_additional_pages(self, soup: BeautifulSoup, city: str, country: str, niche: str, remaining_limit: int) -> List[LeadData]:
-        """Scrape additional pages for more results"""
+    def _scrape_additional_pages(self, soup: BeautifulSoup, city: str, country: str, niche: str,
+                                 niche_tokens: FrozenSet[str], seen_urls: Set[str], remaining_limit: int,
+                                 scraped_at: str) -> List[LeadData]:
+        """Scrape additional pages for more results.
+        
+        The pagination link is read from the current page's soup, which the
+        callee must not re-parse; only the next page is fetched and parsed.
+        """
         leads = []
         
         try:
             # Look for pagination links
-            next_page_selectors = [
-                'a[aria-label="Next"]',
-                '.pagination a[href*="page="]',
-                '.next-page a',
-                'a[href*="page="]'
-            ]
-            
             next_url = None
-            for selector in next_page_selectors:
-                next_elem = soup.select_one(selector)
+            for selector in NEXT_PAGE_SELECTORS:
+                next_elem = selector.select_one(soup)
                 if next_elem:
                     next_url = next_elem.get('href')
                     break
@@ -282,10 +292,11 @@ class YellowPagesScraper(BaseScraper):
                     next_url = f"https://www.yellowpages.com{next_url}"
                 
                 response = self._make_request(next_url)
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = self._parse_results_page(response)
                 
                 # Extract more listings
-                additional_leads = self._extract_business_listings(soup, city, country, niche)
+                additional_leads = self._extract_business_listings(soup, city, country, niche, niche_tokens,
+                                                                  seen_urls, scraped_at)
                 leads.extend(additional_leads[:remaining_limit])
                 
         except Exception as e:
@@ -295,5 +306,4 @@ class YellowPagesScraper(BaseScraper):
     
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
-        from datetime import datetime
         return datetime.now().isoformat()
@@ -4,12 +4,82 @@ Scrapes business listings from Yelp search results
 """
 
 import re
-from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+import json
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
 import logging
 from urllib.parse import quote_plus, urljoin
 from .base_scraper import BaseScraper, LeadData
 
+# orjson parses the embedded page payload several times faster
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Listing data Yelp embeds in the page as JSON; when present it is read
+# instead of the HTML, whose hashed class names change with every deploy
+NEXT_DATA_PATTERN = re.compile(rb'<script id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+# Yelp shows this many results per search page; later pages are the same
+# search with a start= offset
+RESULTS_PER_PAGE = 10
+
+# Result pages fetched at once
+PAGE_WORKERS = 8
+
+# Only search result cards are kept when parsing a results page; the
+# navigation, inline JSON and footer never become a tree
+RESULTS_STRAINER = SoupStrainer(attrs={'data-testid': 'serp-ia-card'})
+RESULT_CARD_SELECTOR = sv.compile('[data-testid="serp-ia-card"]')
+
+# Yelp's module classes look like businessName__09f24__3Ml0X, with a build
+# hash that changes on every deploy, so they are matched by prefix (first
+# class in the attribute, or any later one)
+def class_prefix(prefix: str, descendant: str = '') -> str:
+    """Selector group matching elements with a class starting with prefix"""
+    return f'[class^="{prefix}"]{descendant}, [class*=" {prefix}"]{descendant}'
+
+# Listing container selectors in order of preference, ending with the
+# general result block; compiled once at import instead of being parsed
+# again for every page
+LISTING_SELECTORS = tuple(sv.compile(selector) for selector in (
+    '[data-testid="serp-ia-card"]',
+    class_prefix('container__'),
+    class_prefix('mainAttributes__'),
+    class_prefix('businessName__'),
+    '.searchResult',
+))
+
+# Union of LISTING_SELECTORS, so the page is walked once for all of them
+LISTING_UNION_SELECTOR = sv.compile(', '.join(selector.pattern for selector in LISTING_SELECTORS))
+
+# Listing fields use one grouped selector each, so a listing is walked
+# once per field and matches come back in document order
+NAME_SELECTOR = sv.compile(
+    f'h3 a, {class_prefix("businessName__", " a")}, h4 a, .css-1m051bw a, a[href*="/biz/"]'
+)
+
+ADDRESS_SELECTOR = sv.compile(
+    f'.css-1e4fdj9, .css-1e4fdj9 p, {class_prefix("secondaryAttributes__")}, {class_prefix("address__")}'
+)
+
+# Also covers tel: links inside the address block
+PHONE_SELECTOR = sv.compile('[href^="tel:"]')
+
+WEBSITE_SELECTOR = sv.compile('a[href*="biz.yelp.com"], a[href*="yelp.com/biz"]')
+
+RATING_SELECTOR = sv.compile('[aria-label*="star"]')
+
+CATEGORY_SELECTOR = sv.compile('.css-1e4fdj9 span, .css-1e4fdj9 a')
+
+# Categories read per listing; Yelp lists the real ones first, and the
+# rest of the block is amenities and review snippets
+MAX_CATEGORIES = 8
+
 class YelpScraper(BaseScraper):
     """Scraper for Yelp business listings"""
     
@@ -47,17 +117,27 @@ class YelpScraper(BaseScraper):
             
             # Make request
             response = self._make_request(self.base_url, params=params)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            
+            # One timestamp for every lead found by this search
+            scraped_at = self._get_timestamp()
+            
+            # Niche words matched against each listing's categories
+            niche_tokens = frozenset(niche.lower().split())
+            
+            # Name/address keys of businesses already taken; sponsored cards
+            # repeat across pages
+            seen = set()
             
             # Extract business listings
-            leads.extend(self._extract_business_listings(soup, city, country, niche))
+            page_leads, has_next = self._extract_page(response, city, country, niche, niche_tokens, scraped_at,
+                                                      max_count=limit)
+            leads.extend(self._take_unique(page_leads, seen, limit))
             
             # Try to get more results from pagination
-            if len(leads) < limit:
-                leads.extend(self._scrape_additional_pages(soup, city, country, niche, limit - len(leads)))
-            
-            # Limit results
-            leads = leads[:limit]
+            if has_next and len(leads) < limit:
+                more_leads = self._scrape_additional_pages(params, city, country, niche, niche_tokens,
+                                                           limit - len(leads), scraped_at)
+                leads.extend(self._take_unique(more_leads, seen, limit - len(leads)))
             
             self._logger.info(f"Found {len(leads)} leads from Yelp")
             
@@ -66,33 +146,134 @@ class YelpScraper(BaseScraper):
         
         return leads
     
-    def _extract_business_listings(self, soup: BeautifulSoup, city: str, country: str, niche: str) -> List[LeadData]:
-        """Extract business listings from search results page"""
+    def _extract_page(self, response, city: str, country: str, niche: str, niche_tokens: FrozenSet[str],
+                      scraped_at: str, max_count: Optional[int] = None) -> Tuple[List[LeadData], bool]:
+        """
+        Extract up to max_count of a results page's leads, and whether a
+        next page is likely
+        
+        Reads the embedded __NEXT_DATA__ payload when the page has one and
+        falls back to parsing the HTML otherwise.
+        """
+        businesses = self._next_data_businesses(response.content)
+        if businesses is not None:
+            leads = []
+            for business in businesses:
+                if max_count is not None and len(leads) >= max_count:
+                    break
+                lead = self._parse_next_data_business(business, city, country, niche, niche_tokens, scraped_at)
+                if lead:
+                    leads.append(lead)
+            return leads, len(businesses) >= RESULTS_PER_PAGE
+        
+        soup = self._parse_results_page(response)
+        leads = self._extract_business_listings(soup, city, country, niche, niche_tokens, scraped_at, max_count)
+        
+        # Yelp fills every page but the last, and further pages are built
+        # from start= offsets, so no pagination links are looked up. Cards
+        # are counted too, since some fail validation
+        has_next = (
+            len(leads) >= RESULTS_PER_PAGE
+            or len(RESULT_CARD_SELECTOR.select(soup, limit=RESULTS_PER_PAGE)) >= RESULTS_PER_PAGE
+        )
+        return leads, has_next
+    
+    def _next_data_businesses(self, content: bytes) -> Optional[List[Dict]]:
+        """Get the search result businesses from the page's JSON payload, if any"""
+        match = NEXT_DATA_PATTERN.search(content)
+        if not match:
+            return None
+        
+        try:
+            data = json_loads(match.group(1))
+            components = data['props']['pageProps']['searchPageProps']['mainContentComponentsListProps']
+        # orjson.JSONDecodeError subclasses ValueError as well
+        except (ValueError, KeyError, TypeError) as e:
+            self._logger.debug(f"Unusable __NEXT_DATA__ payload: {e}")
+            return None
+        
+        businesses = [
+            component['searchResultBusiness'] for component in components
+            if isinstance(component, dict) and isinstance(component.get('searchResultBusiness'), dict)
+        ]
+        return businesses or None
+    
+    def _parse_next_data_business(self, business: Dict, city: str, country: str, niche: str,
+                                  niche_tokens: FrozenSet[str], scraped_at: str) -> Optional[LeadData]:
+        """Build a lead from one business in the page's JSON payload"""
+        name = self._clean_text(business.get('name') or '')
+        address = self._clean_text(business.get('formattedAddress') or '') or f"{city}, {country}"
+        categories = [
+            category['title'] for category in business.get('categories') or ()
+            if isinstance(category, dict) and category.get('title')
+        ]
+        refined_niche = self._refine_niche(niche, niche_tokens, categories)
+        
+        if not self._has_valid_fields(name, address, city, country, refined_niche):
+            return None
+        
+        website = business.get('businessUrl') or ''
+        if website.startswith('/'):
+            website = f"https://www.yelp.com{website}"
+        phone = business.get('phone') or ''
+        
+        return LeadData(
+            name=name,
+            address=address,
+            city=city,
+            country=country,
+            niche=refined_niche,
+            phone=self._extract_phone(phone) if phone else None,
+            email=None,  # Yelp doesn't typically show emails
+            website=website if website else None,
+            source="Yelp",
+            scraped_at=scraped_at
+        )
+    
+    def _refine_niche(self, niche: str, niche_tokens: FrozenSet[str], categories) -> str:
+        """Pick the listing category matching the niche, or keep the niche"""
+        if categories and niche.lower() not in ' '.join(categories).lower():
+            # Try to find a category that matches our niche
+            for cat in categories:
+                cat_lower = cat.lower()
+                if any(word in cat_lower for word in niche_tokens):
+                    return cat
+        return niche
+    
+    def _parse_results_page(self, response) -> BeautifulSoup:
+        """Parse a search results page, keeping only its result cards"""
+        # lxml's C parser is several times faster than html.parser on
+        # result pages this size
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=RESULTS_STRAINER)
+        if soup.find(True) is None:
+            # No cards: the markup has changed, so parse the whole page for
+            # the fallback selectors
+            soup = BeautifulSoup(response.content, 'lxml')
+        return soup
+    
+    def _extract_business_listings(self, soup: BeautifulSoup, city: str, country: str, niche: str,
+                                   niche_tokens: FrozenSet[str], scraped_at: str,
+                                   max_count: Optional[int] = None) -> List[LeadData]:
+        """Extract up to max_count business listings from search results page"""
         leads = []
         
         try:
-            # Look for business listing containers
-            listing_selectors = [
-                '[data-testid="serp-ia-card"]',
-                '.container__09f24__mpR8_',
-                '.mainAttributes__09f24__mrQp8',
-                '.businessName__09f24__3Ml0X'
-            ]
-            
+            # Look for business listing containers in a single walk, then
+            # keep the matches of the most preferred selector. The containers
+            # nest, so the union alone would yield each card several times.
+            matches = LISTING_UNION_SELECTOR.select(soup)
             listings = []
-            for selector in listing_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    listings = elements
+            for selector in LISTING_SELECTORS:
+                listings = [element for element in matches if selector.match(element)]
+                if listings:
                     break
             
-            # If no specific selectors found, try general approach
-            if not listings:
-                listings = soup.select('.searchResult')
-            
             for listing in listings:
-                lead = self._parse_business_listing(listing, city, country, niche)
-                if lead and self._validate_lead(lead):
+                # Trailing cards are not parsed once the caller has enough
+                if max_count is not None and len(leads) >= max_count:
+                    break
+                lead = self._parse_business_listing(listing, city, country, niche, niche_tokens, scraped_at)
+                if lead:
                     leads.append(lead)
                     
         except Exception as e:
@@ -100,111 +281,72 @@ class YelpScraper(BaseScraper):
         
         return leads
     
-    def _parse_business_listing(self, element, city: str, country: str, niche: str) -> Optional[LeadData]:
+    def _parse_business_listing(self, element, city: str, country: str, niche: str,
+                                niche_tokens: FrozenSet[str], scraped_at: str) -> Optional[LeadData]:
         """Parse individual business listing"""
         try:
             # Extract business name
-            name_selectors = [
-                'h3 a',
-                '.businessName__09f24__3Ml0X a',
-                'h4 a',
-                '.css-1m051bw a',
-                'a[href*="/biz/"]'
-            ]
-            
             name = ""
             business_url = ""
-            for selector in name_selectors:
-                name_elem = element.select_one(selector)
-                if name_elem:
-                    name = name_elem.get_text(strip=True)
-                    business_url = name_elem.get('href', '')
-                    break
+            name_elem = NAME_SELECTOR.select_one(element)
+            if name_elem:
+                name = name_elem.get_text(strip=True)
+                business_url = name_elem.get('href', '')
             
             if not name:
                 return None
+            name = self._clean_text(name)
             
             # Extract address
-            address_selectors = [
-                '.css-1e4fdj9',
-                '.css-1e4fdj9 p',
-                '.secondaryAttributes__09f24__3Ml0X',
-                '.address__09f24__3Ml0X'
-            ]
-            
             address = ""
-            for selector in address_selectors:
-                addr_elem = element.select_one(selector)
-                if addr_elem:
-                    addr_text = addr_elem.get_text(strip=True)
-                    # Clean up address text
-                    addr_text = re.sub(r'\s+', ' ', addr_text)
-                    if len(addr_text) > 10:  # Reasonable address length
-                        address = addr_text
+            for addr_elem in ADDRESS_SELECTOR.iselect(element):
+                addr_text = addr_elem.get_text(strip=True)
+                # Clean up address text (collapses whitespace, so the
+                # address needs no second pass below)
+                addr_text = self._clean_text(addr_text)
+                if len(addr_text) > 10:  # Reasonable address length
+                    address = addr_text
+                    break
+            address = address or f"{city}, {country}"
+            
+            # Extract categories/tags
+            categories = {}  # insertion-ordered set
+            for cat_elem in CATEGORY_SELECTOR.iselect(element):
+                cat_text = cat_elem.get_text(strip=True)
+                if cat_text and len(cat_text) > 2:
+                    categories[cat_text] = None
+                    if len(categories) >= MAX_CATEGORIES:
                         break
             
-            # Extract phone number
-            phone = ""
-            phone_selectors = [
-                '[href^="tel:"]',
-                '.css-1e4fdj9 a[href^="tel:"]'
-            ]
+            # Use categories to refine niche if available
+            refined_niche = self._refine_niche(niche, niche_tokens, categories)
             
-            for selector in phone_selectors:
-                phone_elem = element.select_one(selector)
-                if phone_elem:
-                    phone = phone_elem.get('href', '').replace('tel:', '')
-                    break
+            if not self._has_valid_fields(name, address, city, country, refined_niche):
+                return None
+            
+            # Extract phone number
+            phone_elem = PHONE_SELECTOR.select_one(element)
+            phone = phone_elem.get('href', '').replace('tel:', '') if phone_elem else ""
             
             # Extract website
             website = ""
-            website_selectors = [
-                'a[href*="biz.yelp.com"]',
-                'a[href*="yelp.com/biz"]'
-            ]
-            
-            for selector in website_selectors:
-                website_elem = element.select_one(selector)
-                if website_elem:
-                    href = website_elem.get('href', '')
-                    if href.startswith('/'):
-                        website = f"https://www.yelp.com{href}"
-                    else:
-                        website = href
-                    break
+            website_elem = WEBSITE_SELECTOR.select_one(element)
+            if website_elem:
+                href = website_elem.get('href', '')
+                if href.startswith('/'):
+                    website = f"https://www.yelp.com{href}"
+                else:
+                    website = href
             
             # Extract rating and review info (for additional context)
-            rating_elem = element.select_one('[aria-label*="star"]')
+            rating_elem = RATING_SELECTOR.select_one(element)
             rating = ""
             if rating_elem:
                 rating = rating_elem.get('aria-label', '')
             
-            # Extract categories/tags
-            categories = []
-            category_selectors = [
-                '.css-1e4fdj9 span',
-                '.css-1e4fdj9 a'
-            ]
-            
-            for selector in category_selectors:
-                cat_elems = element.select(selector)
-                for cat_elem in cat_elems:
-                    cat_text = cat_elem.get_text(strip=True)
-                    if cat_text and len(cat_text) > 2 and cat_text not in categories:
-                        categories.append(cat_text)
-            
-            # Use categories to refine niche if available
-            refined_niche = niche
-            if categories and niche.lower() not in ' '.join(categories).lower():
-                # Try to find a category that matches our niche
-                for cat in categories:
-                    if any(word in cat.lower() for word in niche.lower().split()):
-                        refined_niche = cat
-                        break
-            
             return LeadData(
-                name=self._clean_text(name),
-                address=self._clean_text(address) or f"{city}, {country}",
+                name=name,
+                address=address,
                 city=city,
                 country=country,
                 niche=refined_niche,
@@ -212,50 +354,64 @@ class YelpScraper(BaseScraper):
                 email=None,  # Yelp doesn't typically show emails
                 website=website if website else None,
                 source="Yelp",
-                scraped_at=self._get_timestamp()
+                scraped_at=scraped_at
             )
             
         except Exception as e:
             self._logger.warning(f"Error parsing business listing: {e}")
             return None
     
-    def _scrape_additional_pages(self, soup: BeautifulSoup, city: str, country: str, niche: str, remaining_limit: int) -> List[LeadData]:
-        """Scrape additional pages for more results"""
+    def _take_unique(self, leads: List[LeadData], seen: Set[Tuple[str, str]],
+                     max_count: int) -> List[LeadData]:
+        """Return up to max_count leads whose name/address key is not in seen, adding theirs"""
+        unique = []
+        for lead in leads:
+            if len(unique) >= max_count:
+                break
+            key = (lead.name.lower(), lead.address.lower())
+            if key not in seen:
+                seen.add(key)
+                unique.append(lead)
+        return unique
+    
+    def _scrape_additional_pages(self, params: Dict, city: str, country: str, niche: str,
+                                 niche_tokens: FrozenSet[str], remaining_limit: int, scraped_at: str) -> List[LeadData]:
+        """Scrape additional pages for more results, fetching them concurrently"""
         leads = []
         
         try:
-            # Look for pagination links
-            next_page_selectors = [
-                'a[aria-label="Next"]',
-                '.css-1m051bw a[href*="start="]',
-                'a[href*="start="]'
-            ]
-            
-            next_url = None
-            for selector in next_page_selectors:
-                next_elem = soup.select_one(selector)
-                if next_elem:
-                    next_url = next_elem.get('href')
-                    break
-            
-            if next_url and remaining_limit > 0:
-                # Make request to next page
-                if next_url.startswith('/'):
-                    next_url = f"https://www.yelp.com{next_url}"
-                
-                response = self._make_request(next_url)
-                soup = BeautifulSoup(response.content, 'html.parser')
+            if remaining_limit > 0:
+                # Every page still needed is addressed by its start= offset,
+                # so they can all be requested at once
+                page_count = -(-remaining_limit // RESULTS_PER_PAGE)
+                starts = range(RESULTS_PER_PAGE, RESULTS_PER_PAGE * (page_count + 1), RESULTS_PER_PAGE)
                 
-                # Extract more listings
-                additional_leads = self._extract_business_listings(soup, city, country, niche)
-                leads.extend(additional_leads[:remaining_limit])
+                with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+                    pages = executor.map(
+                        lambda start: self._scrape_page(params, start, city, country, niche, niche_tokens,
+                                                        remaining_limit, scraped_at),
+                        starts
+                    )
+                    # Pages come back in offset order
+                    for page_leads in pages:
+                        leads.extend(page_leads)
                 
         except Exception as e:
             self._logger.warning(f"Error scraping additional pages: {e}")
         
         return leads
     
+    def _scrape_page(self, params: Dict, start: int, city: str, country: str, niche: str,
+                     niche_tokens: FrozenSet[str], max_count: int, scraped_at: str) -> List[LeadData]:
+        """Fetch and extract up to max_count leads from one further results page (empty on failure)"""
+        try:
+            response = self._make_request(self.base_url, params={**params, 'start': str(start)})
+            return self._extract_page(response, city, country, niche, niche_tokens, scraped_at, max_count)[0]
+            
+        except Exception as e:
+            self._logger.warning(f"Error scraping results page at offset {start}: {e}")
+            return []
+    
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
-        from datetime import datetime
         return datetime.now().isoformat()